@@ -14,6 +14,9 @@ import sys
 import shutil
 import subprocess
 import platform
+from builtins import open as _open
+from functools import lru_cache
+from importlib.util import find_spec
 from pathlib import Path
 
 def show_platform_info():
@@ -101,7 +104,7 @@ TOOLKIT_EXAMPLES_DIR={Path.cwd() / 'examples'}
             print(f"❌ No write permission to directory: {parent_dir}")
             return False
             
-        with open(toolkit_env, 'w', encoding='utf-8') as f:
+        with _open(toolkit_env, 'w', encoding='utf-8') as f:
             f.write(env_content)
             f.flush()  # Ensure data is written
             
@@ -132,7 +135,7 @@ def load_toolkit_environment():
 
     env_vars = {}
     try:
-        with open(toolkit_env, 'r', encoding='utf-8') as f:
+        with _open(toolkit_env, 'r', encoding='utf-8') as f:
             for line in f:
                 line = line.strip()
                 if line and not line.startswith('#') and '=' in line:
@@ -165,6 +168,13 @@ def get_python_executable():
     if python_exec and Path(python_exec).exists():
         return python_exec
 
+    return _find_python_command(os.environ.get('PATH', ''))
+
+# Only the command probe is cached, since it spawns `python3 --version`; keyed on
+# PATH so a changed PATH probes again, while .toolkit_env and cwd are re-read every call
+@lru_cache(maxsize=4)
+def _find_python_command(search_path):
+    """Find a Python command name on search_path (the current PATH)"""
     # Fallback to common Python command names
     python_commands = ['python3', 'python']
     for cmd in python_commands:
@@ -271,21 +281,13 @@ def check_python_version():
 
 def check_dependencies():
     """Check if required packages are installed"""
-    try:
-        import requests
-        print("✅ requests package found")
-    except ImportError:
-        print("❌ requests package not found")
-        print("📦 Install with: pip install -r migration/requirements.txt")
-        return False
-
-    try:
-        from dotenv import load_dotenv
-        print("✅ python-dotenv package found")
-    except ImportError:
-        print("❌ python-dotenv package not found")
-        print("📦 Install with: pip install -r migration/requirements.txt")
-        return False
+    # find_spec locates each package without importing it
+    for module_name, package_name in (('requests', 'requests'), ('dotenv', 'python-dotenv')):
+        if find_spec(module_name) is None:
+            print(f"❌ {package_name} package not found")
+            print("📦 Install with: pip install -r migration/requirements.txt")
+            return False
+        print(f"✅ {package_name} package found")
 
     return True
 
@@ -360,7 +362,7 @@ def run_analysis():
 
     # Check if required variables are set
     try:
-        with open(env_file, 'r', encoding='utf-8') as f:
+        with _open(env_file, 'r', encoding='utf-8') as f:
             content = f.read()
             if "your_organization_here" in content or "your_token_here" in content:
                 print("❌ Please configure your credentials in migration/.env first")
@@ -600,7 +602,7 @@ def display_readme_content(readme_path):
             print(f"❌ No read permission for: {readme_path}")
             return
             
-        with open(readme_path, 'r', encoding='utf-8') as f:
+        with _open(readme_path, 'r', encoding='utf-8') as f:
             content = f.read()
             
         if not content.strip():
@@ -14,6 +14,7 @@ import sys
 import json
 import re
 import base64
+import logging
 import time
 import pickle
 from pathlib import Path
@@ -23,6 +24,33 @@ from urllib.parse import quote
 import requests
 from dotenv import load_dotenv
 
+# Retry/backoff diagnostics; main() routes them to stdout alongside the other output
+logger = logging.getLogger(__name__)
+
+# Markdown -> MediaWiki substitutions, applied in order by ContentConverter.markdown_to_mediawiki
+_MARKDOWN_SUBSTITUTIONS = (
+    # Headers
+    (re.compile(r'^# (.+)$', re.MULTILINE), r'= \1 ='),
+    (re.compile(r'^## (.+)$', re.MULTILINE), r'== \1 =='),
+    (re.compile(r'^### (.+)$', re.MULTILINE), r'=== \1 ==='),
+    (re.compile(r'^#### (.+)$', re.MULTILINE), r'==== \1 ===='),
+    (re.compile(r'^##### (.+)$', re.MULTILINE), r'===== \1 ====='),
+    # Bold and italic
+    (re.compile(r'\*\*(.+?)\*\*'), r"'''\1'''"),
+    (re.compile(r'\*(.+?)\*'), r"''\1''"),
+    (re.compile(r'__(.+?)__'), r"'''\1'''"),
+    (re.compile(r'_(.+?)_'), r"''\1''"),
+    # Links
+    (re.compile(r'\[(.+?)\]\((.+?)\)'), r'[\2 \1]'),
+    # Code blocks
+    (re.compile(r'```(\w+)?\n(.*?)\n```', re.DOTALL), r'<syntaxhighlight lang="\1">\n\2\n</syntaxhighlight>'),
+    (re.compile(r'`(.+?)`'), r'<code>\1</code>'),
+    # Lists
+    (re.compile(r'^(\s*)- (.+)$', re.MULTILINE), r'\1* \2'),
+    (re.compile(r'^(\s*)\d+\. (.+)$', re.MULTILINE), r'\1# \2'),
+)
+_MD_EXTENSION = re.compile(r'\.md$')
+
 
 class AzureDevOpsWikiClient:
     """Client for Azure DevOps Wiki REST API"""
@@ -32,7 +60,11 @@ class AzureDevOpsWikiClient:
         """
         Make API request with retry logic and proper error handling.
         """
-        for attempt in range(max_retries):
+        # Waiting out a 429 does not use up an attempt; it is capped separately so a
+        # server that keeps rate limiting still ends in the HTTPError
+        attempt = 0
+        rate_limit_waits = 0
+        while True:
             try:
                 if method.upper() == 'GET':
                     response = self.session.get(url, timeout=30)
@@ -45,29 +77,33 @@ class AzureDevOpsWikiClient:
                 return response.json()
                 
             except requests.exceptions.Timeout:
-                if attempt == max_retries - 1:
+                if attempt >= max_retries - 1:
                     raise
                 wait_time = backoff_factor * (2 ** attempt)
-                print(f"⏳ Request timed out, retrying in {wait_time}s...")
+                logger.warning("⏳ Request timed out, retrying in %ss...", wait_time,
+                               extra={'wait_time': wait_time})
                 time.sleep(wait_time)
+                attempt += 1
                 
             except requests.exceptions.ConnectionError:
-                if attempt == max_retries - 1:
+                if attempt >= max_retries - 1:
                     raise
                 wait_time = backoff_factor * (2 ** attempt)
-                print(f"⚠️  Connection error, retrying in {wait_time}s...")
+                logger.warning("⚠️  Connection error, retrying in %ss...", wait_time,
+                               extra={'wait_time': wait_time})
                 time.sleep(wait_time)
+                attempt += 1
                 
             except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 429:  # Rate limited
+                if e.response.status_code == 429 and rate_limit_waits < max_retries:  # Rate limited
+                    rate_limit_waits += 1
                     retry_after = int(e.response.headers.get('Retry-After', 60))
-                    print(f"⏳ Rate limited, waiting {retry_after}s...")
+                    logger.warning("⏳ Rate limited, waiting %ss...", retry_after,
+                                   extra={'retry_after': retry_after})
                     time.sleep(retry_after)
                     continue
                 else:
                     raise
-                    
-        return {}
         
     def __init__(self, organization: str, project: str, personal_access_token: str):
         self.organization = organization
@@ -143,7 +179,8 @@ class MediaWikiClient:
                 if attempt == max_retries - 1:
                     print(f"❌ MediaWiki API request timed out after {max_retries} attempts")
                     raise
-                print(f"⏳ Request timed out, retrying... (attempt {attempt + 1}/{max_retries})")
+                logger.warning("⏳ Request timed out, retrying... (attempt %d/%d)", attempt + 1, max_retries,
+                               extra={'attempt': attempt + 1})
                 time.sleep(2 ** attempt)  # Exponential backoff
                 
             except requests.exceptions.ConnectionError as e:
@@ -151,7 +188,8 @@ class MediaWikiClient:
                     print(f"❌ MediaWiki connection failed: {e}")
                     print("💡 Check MediaWiki URL and network connectivity")
                     raise
-                print(f"⚠️  Connection error, retrying... (attempt {attempt + 1}/{max_retries})")
+                logger.warning("⚠️  Connection error, retrying... (attempt %d/%d)", attempt + 1, max_retries,
+                               extra={'attempt': attempt + 1})
                 time.sleep(2 ** attempt)
                 
             except requests.exceptions.HTTPError as e:
@@ -165,7 +203,8 @@ class MediaWikiClient:
                     if attempt == max_retries - 1:
                         print(f"❌ MediaWiki server error: {e.response.status_code}")
                         raise
-                    print(f"⚠️  Server error, retrying... (attempt {attempt + 1}/{max_retries})")
+                    logger.warning("⚠️  Server error, retrying... (attempt %d/%d)", attempt + 1, max_retries,
+                                   extra={'attempt': attempt + 1, 'status_code': e.response.status_code})
                     time.sleep(5)  # Longer wait for server errors
                 else:
                     print(f"❌ MediaWiki API request failed: {e}")
@@ -271,29 +310,8 @@ class ContentConverter:
         """Convert Markdown to MediaWiki syntax"""
         content = markdown_content
 
-        # Headers
-        content = re.sub(r'^# (.+)$', r'= \1 =', content, flags=re.MULTILINE)
-        content = re.sub(r'^## (.+)$', r'== \1 ==', content, flags=re.MULTILINE)
-        content = re.sub(r'^### (.+)$', r'=== \1 ===', content, flags=re.MULTILINE)
-        content = re.sub(r'^#### (.+)$', r'==== \1 ====', content, flags=re.MULTILINE)
-        content = re.sub(r'^##### (.+)$', r'===== \1 =====', content, flags=re.MULTILINE)
-
-        # Bold and italic
-        content = re.sub(r'\*\*(.+?)\*\*', r"'''\1'''", content)
-        content = re.sub(r'\*(.+?)\*', r"''\1''", content)
-        content = re.sub(r'__(.+?)__', r"'''\1'''", content)
-        content = re.sub(r'_(.+?)_', r"''\1''", content)
-
-        # Links
-        content = re.sub(r'\[(.+?)\]\((.+?)\)', r'[\2 \1]', content)
-
-        # Code blocks
-        content = re.sub(r'```(\w+)?\n(.*?)\n```', r'<syntaxhighlight lang="\1">\n\2\n</syntaxhighlight>', content, flags=re.DOTALL)
-        content = re.sub(r'`(.+?)`', r'<code>\1</code>', content)
-
-        # Lists
-        content = re.sub(r'^(\s*)- (.+)$', r'\1* \2', content, flags=re.MULTILINE)
-        content = re.sub(r'^(\s*)\d+\. (.+)$', r'\1# \2', content, flags=re.MULTILINE)
+        for pattern, replacement in _MARKDOWN_SUBSTITUTIONS:
+            content = pattern.sub(replacement, content)
 
         return content
 
@@ -301,7 +319,7 @@ class ContentConverter:
     def sanitize_page_title(title: str) -> str:
         """Sanitize page title for MediaWiki"""
         # Remove .md extension
-        title = re.sub(r'\.md$', '', title)
+        title = _MD_EXTENSION.sub('', title)
 
         # Replace underscores and hyphens with spaces
         title = title.replace('_', ' ').replace('-', ' ')
@@ -564,6 +582,8 @@ def load_config():
 
 def main():
     """Main function"""
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+
     print("🚀 Azure DevOps to MediaWiki Migration Tool")
     print("=" * 50)
 
@@ -15,43 +15,71 @@ import json
 import base64
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
 import requests
 from dotenv import load_dotenv
 
 
+# Maximum concurrent page content requests when sampling a wiki
+_CONTENT_FETCH_WORKERS = 8
+
+# Markdown -> MediaWiki substitutions, applied in order by markdown_to_mediawiki
+_MARKDOWN_SUBSTITUTIONS = (
+    # Headers
+    (re.compile(r'^# (.+)$', re.MULTILINE), r'= \1 ='),
+    (re.compile(r'^## (.+)$', re.MULTILINE), r'== \1 =='),
+    (re.compile(r'^### (.+)$', re.MULTILINE), r'=== \1 ==='),
+    (re.compile(r'^#### (.+)$', re.MULTILINE), r'==== \1 ===='),
+    (re.compile(r'^##### (.+)$', re.MULTILINE), r'===== \1 ====='),
+    # Bold and Italic
+    (re.compile(r'\*\*(.+?)\*\*'), r"'''\1'''"),
+    (re.compile(r'\*(.+?)\*'), r"''\1''"),
+    (re.compile(r'__(.+?)__'), r"'''\1'''"),
+    (re.compile(r'_(.+?)_'), r"''\1''"),
+    # Links
+    (re.compile(r'\[(.+?)\]\((.+?)\)'), r'[\2 \1]'),
+    # Code blocks
+    (re.compile(r'```(\w+)?\n(.*?)\n```', re.DOTALL), r'<syntaxhighlight lang="\1">\n\2\n</syntaxhighlight>'),
+    (re.compile(r'`(.+?)`'), r'<code>\1</code>'),
+    # Lists
+    (re.compile(r'^(\s*)- (.+)$', re.MULTILINE), r'\1* \2'),
+    (re.compile(r'^(\s*)\d+\. (.+)$', re.MULTILINE), r'\1# \2'),
+)
+_TABLE_SEPARATOR_CELL = re.compile(r'^[-\\s:]*$')
+
+# Patterns used by analyze_conversion_issues
+_IMAGE_PATTERN = re.compile(r'!\\[.*?\\]\\(.*?\\)')
+_HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+_INTERNAL_LINK_PATTERN = re.compile(r'\\[.*?\\]\\((?!http).*?\\)')
+_TASK_LIST_PATTERN = re.compile(r'- \[[ x]\]')
+_STRIKETHROUGH_PATTERN = re.compile(r'~~.*?~~')
+_FOOTNOTE_PATTERN = re.compile(r'\\[\\^.*?\\]')
+
+
+def _count_matches(pattern: re.Pattern, text: str) -> int:
+    """Count non-overlapping matches without building a list of them"""
+    return sum(1 for _ in pattern.finditer(text))
+
+
 class ContentConverter:
     """Converts content from Markdown (Azure DevOps) to MediaWiki syntax"""
 
     @staticmethod
+    @lru_cache(maxsize=8)
     def markdown_to_mediawiki(markdown_content: str) -> str:
-        """Convert Markdown to MediaWiki syntax with detailed tracking"""
-        content = markdown_content
-
-        # Headers
-        content = re.sub(r'^# (.+)$', r'= \1 =', content, flags=re.MULTILINE)
-        content = re.sub(r'^## (.+)$', r'== \1 ==', content, flags=re.MULTILINE)
-        content = re.sub(r'^### (.+)$', r'=== \1 ===', content, flags=re.MULTILINE)
-        content = re.sub(r'^#### (.+)$', r'==== \1 ====', content, flags=re.MULTILINE)
-        content = re.sub(r'^##### (.+)$', r'===== \1 =====', content, flags=re.MULTILINE)
-
-        # Bold and Italic
-        content = re.sub(r'\*\*(.+?)\*\*', r"'''\1'''", content)
-        content = re.sub(r'\*(.+?)\*', r"''\1''", content)
-        content = re.sub(r'__(.+?)__', r"'''\1'''", content)
-        content = re.sub(r'_(.+?)_', r"''\1''", content)
-
-        # Links
-        content = re.sub(r'\[(.+?)\]\((.+?)\)', r'[\2 \1]', content)
+        """Convert Markdown to MediaWiki syntax with detailed tracking
 
-        # Code blocks
-        content = re.sub(r'```(\w+)?\n(.*?)\n```', r'<syntaxhighlight lang="\1">\n\2\n</syntaxhighlight>', content, flags=re.DOTALL)
-        content = re.sub(r'`(.+?)`', r'<code>\1</code>', content)
+        Conversion is a pure function of the input, so the last few results are
+        cached for back-to-back previews of the same page; the small bound keeps
+        at most a handful of page bodies alive.
+        """
+        content = markdown_content
 
-        # Lists
-        content = re.sub(r'^(\s*)- (.+)$', r'\1* \2', content, flags=re.MULTILINE)
-        content = re.sub(r'^(\s*)\d+\. (.+)$', r'\1# \2', content, flags=re.MULTILINE)
+        for pattern, replacement in _MARKDOWN_SUBSTITUTIONS:
+            content = pattern.sub(replacement, content)
 
         # Tables (enhanced conversion)
         lines = content.split('\n')
@@ -74,7 +102,7 @@ class ContentConverter:
 
                 # Check if this is the header separator line
                 cells = [cell.strip() for cell in line.strip().split('|')[1:-1]]
-                if all(re.match(r'^[-\\s:]*$', cell) for cell in cells):
+                if all(_TABLE_SEPARATOR_CELL.match(cell) for cell in cells):
                     # Header separator line, skip it
                     continue
 
@@ -103,7 +131,7 @@ class ContentConverter:
         }
 
         # Check for images
-        images = re.findall(r'!\\[.*?\\]\\(.*?\\)', original)
+        images = _IMAGE_PATTERN.findall(original)
         if images:
             issues['manual_review_needed'].append(
                 f"🖼️  Found {len(images)} images that need manual upload to MediaWiki"
@@ -112,7 +140,7 @@ class ContentConverter:
                 issues['manual_review_needed'].append(f"   - {img}")
 
         # Check for HTML tags
-        html_tags = re.findall(r'<[^>]+>', original)
+        html_tags = _HTML_TAG_PATTERN.findall(original)
         if html_tags:
             unique_tags = set(tag.split()[0].strip('<>') for tag in html_tags)
             issues['warnings'].append(
@@ -120,31 +148,31 @@ class ContentConverter:
             )
 
         # Check for complex links
-        internal_links = re.findall(r'\\[.*?\\]\\((?!http).*?\\)', original)
+        internal_links = _count_matches(_INTERNAL_LINK_PATTERN, original)
         if internal_links:
             issues['warnings'].append(
-                f"🔗 Found {len(internal_links)} internal links - verify they work after migration"
+                f"🔗 Found {internal_links} internal links - verify they work after migration"
             )
 
         # Check for task lists
-        task_lists = re.findall(r'- \[[ x]\]', original)
+        task_lists = _count_matches(_TASK_LIST_PATTERN, original)
         if task_lists:
             issues['info'].append(
-                f"☑️  Found {len(task_lists)} task list items - converted to regular lists"
+                f"☑️  Found {task_lists} task list items - converted to regular lists"
             )
 
         # Check for strikethrough
-        strikethrough = re.findall(r'~~.*?~~', original)
+        strikethrough = _count_matches(_STRIKETHROUGH_PATTERN, original)
         if strikethrough:
             issues['warnings'].append(
-                f"❌ Found {len(strikethrough)} strikethrough items - may not display correctly"
+                f"❌ Found {strikethrough} strikethrough items - may not display correctly"
             )
 
         # Check for footnotes
-        footnotes = re.findall(r'\\[\\^.*?\\]', original)
+        footnotes = _count_matches(_FOOTNOTE_PATTERN, original)
         if footnotes:
             issues['manual_review_needed'].append(
-                f"📝 Found {len(footnotes)} footnotes - need manual conversion"
+                f"📝 Found {footnotes} footnotes - need manual conversion"
             )
 
         return issues
@@ -249,6 +277,10 @@ class ContentPreviewer:
         # Get content
         original_content = self.get_page_content(wiki_id, target_page['id'])
 
+        return self._build_preview(target_page, original_content)
+
+    def _build_preview(self, target_page: Dict, original_content: str) -> Dict:
+        """Build the preview for a page whose content has already been fetched"""
         if not original_content.strip():
             return {
                 'page_info': target_page,
@@ -286,15 +318,25 @@ class ContentPreviewer:
         if pages:
             sample_pages.append(pages[0])
 
-        # Get pages with content and select diverse sample
+        # Get pages with content and select diverse sample; keep the fetched
+        # content so the selected pages are not downloaded a second time
         pages_with_content = []
-        for page in pages[1:]:  # Skip first since we already added it
+        fetched_content: Dict[str, str] = {}
+
+        def fetch(page: Dict) -> Tuple[Dict, Optional[str]]:
             try:
-                content = self.get_page_content(wiki_id, page['id'])
-                if content.strip():
+                return page, self.get_page_content(wiki_id, page['id'])
+            except Exception as e:
+                print(f"  ⚠️  Error previewing {page['path']}: {e}")
+                return page, None
+
+        other_pages = pages[1:]  # Skip first since we already added it
+        workers = max(1, min(_CONTENT_FETCH_WORKERS, len(other_pages)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for page, content in executor.map(fetch, other_pages):
+                if content and content.strip():
                     pages_with_content.append((page, len(content)))
-            except:
-                continue
+                    fetched_content[page['id']] = content
 
         # Sort by content length and take some from different sizes
         pages_with_content.sort(key=lambda x: x[1], reverse=True)
@@ -316,14 +358,17 @@ class ContentPreviewer:
             if len(sample_pages) >= sample_size:
                 break
             page_candidate = pages_with_content[i][0]
-            if page_candidate not in [p for p in sample_pages]:
+            if page_candidate not in sample_pages:
                 sample_pages.append(page_candidate)
 
         # Preview each sample page
         previews = []
         for page in sample_pages[:sample_size]:
             try:
-                preview = self.preview_page(wiki_id, page['path'])
+                content = fetched_content.get(page['id'])
+                if content is None:
+                    content = self.get_page_content(wiki_id, page['id'])
+                preview = self._build_preview(page, content)
                 previews.append(preview)
                 print(f"  📄 Previewed: {page['path']}")
             except Exception as e:
@@ -13,13 +13,47 @@ import os
 import sys
 import json
 import glob
+import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Tuple, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
+# Template uploads run one at a time by default, as MediaWiki's API etiquette asks
+# and per-user edit rate limits expect; callers can opt into more via max_workers
+DEFAULT_MAX_WORKERS = 1
+
+# Keep-alive connections the session holds open, room for opt-in upload workers
+POOL_MAXSIZE = 8
+
+# File suffixes picked up as templates by import_templates_from_directory, in import order
+TEMPLATE_EXTENSIONS = (".mediawiki", ".wiki")
+_TEMPLATE_EXTENSION_RANK = {ext.lstrip("."): rank for rank, ext in enumerate(TEMPLATE_EXTENSIONS)}
+
+# Page text above this many characters is posted as multipart/form-data rather than
+# urlencoded, which can triple non-ASCII text (MediaWiki recommends multipart for large edits)
+MULTIPART_TEXT_THRESHOLD = 64 * 1024
+
+# Seconds an edit token (and the login behind it) is reused across directory imports
+EDIT_TOKEN_TTL = 300
+
+
+def _template_rank(file_name: str) -> Optional[int]:
+    """Import rank of a template file name, or None if it is not a template
+
+    Matches like glob("*" + extension): one hashed lookup on the last suffix, with
+    case folded only where the platform's paths are case-insensitive.
+    """
+    _, dot, extension = os.path.normcase(file_name).rpartition(".")
+    return _TEMPLATE_EXTENSION_RANK.get(extension) if dot else None
+
 
 class MediaWikiImporter:
     def __init__(self, wiki_url: str, username: str, password: str):
@@ -27,7 +61,24 @@ class MediaWikiImporter:
         self.username = username
         self.password = password
         self.session = requests.Session()
+        # Keep-alive connections to the wiki
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.api_url = f"{self.wiki_url}/api.php"
+        self._edit_token: Optional[Tuple[str, float]] = None
+        # Upload workers share the token; only one of them logs in when it needs refreshing
+        self._token_lock = threading.Lock()
+
+    def __enter__(self) -> "MediaWikiImporter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections"""
+        self.session.close()
 
     def _make_request(self, method: str = "POST", max_retries: int = 3, **params) -> dict:
         """Make a request to the MediaWiki API with retry logic"""
@@ -35,6 +86,9 @@ class MediaWikiImporter:
             try:
                 if method.upper() == "GET":
                     response = self.session.get(self.api_url, params=params, timeout=30)
+                elif len(params.get('text', '')) > MULTIPART_TEXT_THRESHOLD:
+                    fields = {name: (None, value) for name, value in params.items()}
+                    response = self.session.post(self.api_url, files=fields, timeout=30)
                 else:
                     response = self.session.post(self.api_url, data=params, timeout=30)
 
@@ -45,7 +99,8 @@ class MediaWikiImporter:
                 if attempt == max_retries - 1:
                     print(f"❌ API request timed out after {max_retries} attempts")
                     raise Exception("Request timeout - check network connectivity")
-                print(f"⏳ Request timed out, retrying... (attempt {attempt + 1}/{max_retries})")
+                logger.warning("⏳ Request timed out, retrying... (attempt %d/%d)", attempt + 1, max_retries,
+                               extra={'attempt': attempt + 1})
                 time.sleep(2 ** attempt)
                 
             except requests.exceptions.ConnectionError as e:
@@ -53,7 +108,8 @@ class MediaWikiImporter:
                     print(f"❌ API connection failed: {e}")
                     print("💡 Check MediaWiki URL and network connectivity")
                     raise Exception(f"Connection failed: {e}")
-                print(f"⚠️  Connection error, retrying... (attempt {attempt + 1}/{max_retries})")
+                logger.warning("⚠️  Connection error, retrying... (attempt %d/%d)", attempt + 1, max_retries,
+                               extra={'attempt': attempt + 1})
                 time.sleep(2 ** attempt)
                 
             except requests.exceptions.HTTPError as e:
@@ -64,7 +120,8 @@ class MediaWikiImporter:
                     if attempt == max_retries - 1:
                         print(f"❌ Server error: {e.response.status_code}")
                         raise Exception(f"Server error: {e.response.status_code}")
-                    print(f"⚠️  Server error, retrying... (attempt {attempt + 1}/{max_retries})")
+                    logger.warning("⚠️  Server error, retrying... (attempt %d/%d)", attempt + 1, max_retries,
+                                   extra={'attempt': attempt + 1, 'status_code': e.response.status_code})
                     time.sleep(5)
                 else:
                     print(f"❌ API request failed: {e}")
@@ -136,33 +193,80 @@ class MediaWikiImporter:
         print("✅ Edit token obtained")
         return token
 
+    def _get_cached_edit_token(self, ttl: float = EDIT_TOKEN_TTL) -> str:
+        """Return the cached edit token, logging in for a fresh one once it is older than ttl"""
+        with self._token_lock:
+            now = time.monotonic()
+            if self._edit_token is not None and now - self._edit_token[1] < ttl:
+                return self._edit_token[0]
+
+            login_token = self.get_login_token()
+            if not self.login(login_token):
+                sys.exit(1)
+
+            edit_token = self.get_edit_token()
+            self._edit_token = (edit_token, now)
+            return edit_token
+
     def import_template(self, template_name: str, content: str, edit_token: str) -> bool:
         """Import a single template"""
         print(f"📄 Importing Template:{template_name}...")
 
-        response = self._make_request(
-            action="edit",
-            title=f"Template:{template_name}",
-            text=content,
-            token=edit_token,
-            format="json"
-        )
-
-        # Check for success
-        edit_result = response.get("edit", {}).get("result")
-        error_code = response.get("error", {}).get("code")
+        for attempt in range(2):
+            response = self._make_request(
+                action="edit",
+                title=f"Template:{template_name}",
+                text=content,
+                token=edit_token,
+                format="json"
+            )
+
+            # Check for success
+            edit_result = response.get("edit", {}).get("result")
+            error_code = response.get("error", {}).get("code")
+            if error_code != "badtoken" or attempt:
+                break
+
+            # The session expired server-side: drop the rejected token (unless another
+            # upload already replaced it), log in again and retry this edit once
+            print(f"  🔄 Edit token rejected for Template:{template_name}, refreshing...")
+            with self._token_lock:
+                if self._edit_token is not None and self._edit_token[0] == edit_token:
+                    self._edit_token = None
+            edit_token = self._get_cached_edit_token()
 
         if edit_result == "Success":
             print(f"  ✅ Template:{template_name} imported successfully")
             return True
         else:
             error_msg = error_code or response.get("error", {}).get("info") or "unknown error"
-            print(f"  ❌ Failed to import Template:{template_name}")
-            print(f"     Error: {error_msg}")
+            # One line per result, so it stays attached to its template when uploads run in parallel
+            print(f"  ❌ Failed to import Template:{template_name} - Error: {error_msg}")
+            return False
+
+    def _import_template_file(self, template_file: Path) -> bool:
+        """Read and import one template file, reporting (not raising) any error"""
+        try:
+            # Extract template name from filename
+            template_name = template_file.stem
+            if template_name.startswith("Template_"):
+                template_name = template_name[9:]  # Remove "Template_" prefix
+
+            # Read template content in one unbuffered read, then decode it in one go
+            content = template_file.read_bytes().decode('utf-8')
+            if '\r' in content:
+                content = content.replace('\r\n', '\n').replace('\r', '\n')  # As read_text's newline translation
+
+            # Import template with the current token, which an earlier badtoken may have replaced
+            return self.import_template(template_name, content, self._get_cached_edit_token())
+
+        except Exception as e:
+            print(f"❌ Error processing {template_file.name}: {e}")
             return False
 
-    def import_templates_from_directory(self, template_dir: str) -> Tuple[int, int]:
-        """Import all templates from a directory"""
+    def import_templates_from_directory(self, template_dir: str,
+                                        max_workers: int = DEFAULT_MAX_WORKERS) -> Tuple[int, int]:
+        """Import all templates from a directory, uploading up to max_workers at a time (default: one)"""
         print("📦 Importing templates...")
 
         template_path = Path(template_dir)
@@ -170,8 +274,16 @@ class MediaWikiImporter:
             print(f"❌ Template directory not found: {template_dir}")
             sys.exit(1)
 
-        # Find template files
-        template_files = list(template_path.glob("*.mediawiki")) + list(template_path.glob("*.wiki"))
+        # Find template files in a single directory pass
+        ranked_files = []
+        with os.scandir(template_path) as entries:
+            for entry in entries:
+                rank = _template_rank(entry.name)
+                if rank is not None and entry.is_file():
+                    ranked_files.append((rank, entry.name, entry.path))
+
+        # All *.mediawiki files before *.wiki ones, as with one glob per extension; by name within each
+        template_files = [Path(path) for _, _, path in sorted(ranked_files)]
 
         if not template_files:
             print(f"❌ No template files found in {template_dir}")
@@ -180,36 +292,19 @@ class MediaWikiImporter:
 
         print(f"📄 Found {len(template_files)} template files")
 
-        # Get tokens
-        login_token = self.get_login_token()
-        if not self.login(login_token):
-            sys.exit(1)
-
-        edit_token = self.get_edit_token()
-
-        success_count = 0
-        failed_count = 0
+        # Log in (or reuse the cached token) before any file is read
+        self._get_cached_edit_token()
 
-        for template_file in template_files:
-            try:
-                # Extract template name from filename
-                template_name = template_file.stem
-                if template_name.startswith("Template_"):
-                    template_name = template_name[9:]  # Remove "Template_" prefix
-
-                # Read template content
-                with open(template_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-
-                # Import template
-                if self.import_template(template_name, content, edit_token):
-                    success_count += 1
-                else:
-                    failed_count += 1
+        workers = max(1, min(max_workers, len(template_files)))
+        if workers == 1:
+            results = [self._import_template_file(f) for f in template_files]
+        else:
+            # Opt-in: overlap network-bound uploads on the shared session
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(self._import_template_file, template_files))
 
-            except Exception as e:
-                print(f"❌ Error processing {template_file.name}: {e}")
-                failed_count += 1
+        success_count = sum(1 for imported in results if imported)
+        failed_count = len(results) - success_count
 
         return success_count, failed_count
 
@@ -238,6 +333,7 @@ def load_config() -> Tuple[str, str, str, str]:
 
 def main():
     """Main function"""
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
     print("🎨 MediaWiki Template Import Tool")
     print("=" * 40)
 
@@ -245,11 +341,9 @@ def main():
         # Load configuration
         wiki_url, username, password, template_dir = load_config()
 
-        # Initialize importer
-        importer = MediaWikiImporter(wiki_url, username, password)
-
-        # Import templates
-        success_count, failed_count = importer.import_templates_from_directory(template_dir)
+        # Import templates; the session is closed when the block exits
+        with MediaWikiImporter(wiki_url, username, password) as importer:
+            success_count, failed_count = importer.import_templates_from_directory(template_dir)
 
         # Summary
         print("\n" + "=" * 40)
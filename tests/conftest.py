@@ -3,10 +3,12 @@
 Pytest configuration and shared fixtures for MediaWiki migration tools tests.
 """
 
+import copy
 import os
+import sys
 import json
-import tempfile
 from pathlib import Path
+from types import MappingProxyType
 from unittest.mock import MagicMock, patch
 from typing import Dict, List, Any
 
@@ -14,11 +16,30 @@ import pytest
 import requests_mock
 import responses
 
+# Project root, for top-level scripts such as getting_started.py; appended once
+# per session so the per-package entries the test modules prepend still win
+_PROJECT_ROOT = str(Path(__file__).parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 
-@pytest.fixture
+# tests/ itself, so test modules can import the shared helpers module under any
+# --import-mode (pytest only adds it for the default "prepend" mode)
+_TESTS_DIR = str(Path(__file__).parent)
+if _TESTS_DIR not in sys.path:
+    sys.path.append(_TESTS_DIR)
+
+
+@pytest.fixture(scope="session")
+def gs():
+    """The getting_started module, imported once for the whole session."""
+    import getting_started
+    return getting_started
+
+
+@pytest.fixture(scope="session")
 def mock_env_vars():
-    """Fixture providing mock environment variables for testing."""
-    return {
+    """Fixture providing read-only mock environment variables for testing."""
+    return MappingProxyType({
         'AZURE_DEVOPS_ORGANIZATION': 'test-org',
         'AZURE_DEVOPS_PROJECT': 'test-project', 
         'AZURE_DEVOPS_PAT': 'test-pat-token-123',
@@ -27,114 +48,138 @@ def mock_env_vars():
         'WIKI_USERNAME': 'testuser',
         'WIKI_PASSWORD': 'testpass123',
         'TEMPLATE_DIR': 'test-templates'
-    }
+    })
 
 
 @pytest.fixture
-def mock_azure_api_response():
-    """Fixture providing mock Azure DevOps API responses."""
-    return {
-        'wikis': {
-            'value': [
-                {
-                    'id': 'wiki-123',
-                    'name': 'TestWiki',
-                    'type': 'codeWiki',
-                    'url': 'https://dev.azure.com/test-org/test-project/_apis/wiki/wikis/wiki-123'
-                }
-            ]
-        },
-        'pages': {
-            'value': [
-                {
-                    'id': 'page-1',
-                    'path': '/Home',
-                    'order': 0,
-                    'gitItemPath': '/Home.md',
-                    'subPages': []
-                },
-                {
-                    'id': 'page-2', 
-                    'path': '/Documentation/Setup',
-                    'order': 1,
-                    'gitItemPath': '/Documentation/Setup.md',
-                    'subPages': []
-                },
-                {
-                    'id': 'page-3',
-                    'path': '/API/Reference',
-                    'order': 2,
-                    'gitItemPath': '/API/Reference.md',
-                    'subPages': []
-                }
-            ]
-        },
-        'page_content': {
-            'page-1': '# Welcome\n\nThis is the **home page** with some content.\n\n## Features\n- Feature 1\n- Feature 2',
-            'page-2': '# Setup Documentation\n\n```bash\nnpm install\n```\n\n![Setup Diagram](images/setup.png)',
-            'page-3': '# API Reference\n\n| Method | Endpoint | Description |\n|--------|----------|-------------|\n| GET | /api/users | Get users |'
-        }
-    }
+def patched_env(monkeypatch, mock_env_vars):
+    """Fixture applying mock_env_vars to os.environ for a single test.
 
+    Returns the monkeypatch fixture so tests can layer further overrides.
+    """
+    for key, value in mock_env_vars.items():
+        monkeypatch.setenv(key, value)
+    return monkeypatch
 
-@pytest.fixture 
-def mock_mediawiki_api_response():
-    """Fixture providing mock MediaWiki API responses."""
-    return {
-        'login_token': {
-            'query': {
-                'tokens': {
-                    'logintoken': 'test-login-token-456'
-                }
-            }
-        },
-        'login_success': {
-            'login': {
-                'result': 'Success',
-                'lguserid': 1,
-                'lgusername': 'testuser'
+
+# Canned API payloads. Their fixtures hand out deep copies, so a test that mutates
+# a nested list or dict cannot leak the change into other tests on the same worker.
+_AZURE_API_RESPONSE = {
+    'wikis': {
+        'value': [
+            {
+                'id': 'wiki-123',
+                'name': 'TestWiki',
+                'type': 'codeWiki',
+                'url': 'https://dev.azure.com/test-org/test-project/_apis/wiki/wikis/wiki-123'
             }
-        },
-        'edit_token': {
-            'query': {
-                'tokens': {
-                    'csrftoken': 'test-edit-token-789'
-                }
+        ]
+    },
+    'pages': {
+        'value': [
+            {
+                'id': 'page-1',
+                'path': '/Home',
+                'order': 0,
+                'gitItemPath': '/Home.md',
+                'subPages': []
+            },
+            {
+                'id': 'page-2', 
+                'path': '/Documentation/Setup',
+                'order': 1,
+                'gitItemPath': '/Documentation/Setup.md',
+                'subPages': []
+            },
+            {
+                'id': 'page-3',
+                'path': '/API/Reference',
+                'order': 2,
+                'gitItemPath': '/API/Reference.md',
+                'subPages': []
             }
-        },
-        'edit_success': {
-            'edit': {
-                'result': 'Success',
-                'pageid': 100,
-                'title': 'Test Page',
-                'contentmodel': 'wikitext',
-                'oldrevid': 1,
-                'newrevid': 2
+        ]
+    },
+    'page_content': {
+        'page-1': '# Welcome\n\nThis is the **home page** with some content.\n\n## Features\n- Feature 1\n- Feature 2',
+        'page-2': '# Setup Documentation\n\n```bash\nnpm install\n```\n\n![Setup Diagram](images/setup.png)',
+        'page-3': '# API Reference\n\n| Method | Endpoint | Description |\n|--------|----------|-------------|\n| GET | /api/users | Get users |'
+    }
+}
+
+_MEDIAWIKI_API_RESPONSE = {
+    'login_token': {
+        'query': {
+            'tokens': {
+                'logintoken': 'test-login-token-456'
             }
-        },
-        'all_pages': {
-            'query': {
-                'allpages': [
-                    {'pageid': 1, 'ns': 0, 'title': 'Home'},
-                    {'pageid': 2, 'ns': 0, 'title': 'Documentation Setup'}, 
-                    {'pageid': 3, 'ns': 0, 'title': 'API Reference'}
-                ]
+        }
+    },
+    'login_success': {
+        'login': {
+            'result': 'Success',
+            'lguserid': 1,
+            'lgusername': 'testuser'
+        }
+    },
+    'edit_token': {
+        'query': {
+            'tokens': {
+                'csrftoken': 'test-edit-token-789'
             }
-        },
-        'page_content': {
-            'query': {
-                'pages': {
-                    '1': {
-                        'pageid': 1,
-                        'title': 'Home',
-                        'revisions': [{
-                            '*': '= Welcome =\n\nThis is the \'\'\'home page\'\'\' with some content.\n\n== Features ==\n* Feature 1\n* Feature 2'
-                        }]
-                    }
+        }
+    },
+    'edit_success': {
+        'edit': {
+            'result': 'Success',
+            'pageid': 100,
+            'title': 'Test Page',
+            'contentmodel': 'wikitext',
+            'oldrevid': 1,
+            'newrevid': 2
+        }
+    },
+    'all_pages': {
+        'query': {
+            'allpages': [
+                {'pageid': 1, 'ns': 0, 'title': 'Home'},
+                {'pageid': 2, 'ns': 0, 'title': 'Documentation Setup'}, 
+                {'pageid': 3, 'ns': 0, 'title': 'API Reference'}
+            ]
+        }
+    },
+    'page_content': {
+        'query': {
+            'pages': {
+                '1': {
+                    'pageid': 1,
+                    'title': 'Home',
+                    'revisions': [{
+                        '*': '= Welcome =\n\nThis is the \'\'\'home page\'\'\' with some content.\n\n== Features ==\n* Feature 1\n* Feature 2'
+                    }]
                 }
             }
         }
     }
+}
+
+
+@pytest.fixture
+def mock_azure_api_response():
+    """Fixture providing a fresh copy of the mock Azure DevOps API responses."""
+    return copy.deepcopy(_AZURE_API_RESPONSE)
+
+
+@pytest.fixture
+def mock_azure_first_page(mock_azure_api_response):
+    """Fixture providing only the first Azure DevOps page, for single-page migrations."""
+    return tuple(mock_azure_api_response['pages']['value'][:1])
+
+
+@pytest.fixture
+def mock_mediawiki_api_response():
+    """Fixture providing a fresh copy of the mock MediaWiki API responses."""
+    return copy.deepcopy(_MEDIAWIKI_API_RESPONSE)
 
 
 @pytest.fixture
@@ -236,10 +281,9 @@ def hello_world():
 
 
 @pytest.fixture
-def temp_directory():
-    """Fixture providing a temporary directory for file operations."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        yield Path(temp_dir)
+def temp_directory(tmp_path):
+    """Fixture providing a temporary directory for file operations (pytest's tmp_path)."""
+    return tmp_path
 
 
 @pytest.fixture
@@ -388,6 +432,18 @@ def reset_environment():
     os.environ.update(original_env)
 
 
+@pytest.fixture(autouse=True)
+def block_network(request, monkeypatch):
+    """Auto-fixture that fails fast on any HTTP call that escaped its mocks."""
+    if 'network' in request.keywords:
+        return
+
+    def _unmocked_send(adapter, request, *args, **kwargs):
+        pytest.fail(f"Unmocked HTTP call: {request.method} {request.url}")
+
+    monkeypatch.setattr("requests.adapters.HTTPAdapter.send", _unmocked_send)
+
+
 @pytest.fixture
 def capture_print_output(capsys):
     """Fixture to capture print output for testing CLI tools."""
@@ -397,12 +453,37 @@ def capture_print_output(capsys):
     return _capture
 
 
+def pytest_addoption(parser):
+    """Register command line options for the test suite."""
+    parser.addoption(
+        "--runslow", action="store_true", default=False,
+        help="run large-scale variants marked with 'runslow'"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip 'runslow' variants unless --runslow was given."""
+    if config.getoption("--runslow"):
+        return
+    skip_runslow = pytest.mark.skip(reason="needs --runslow to run")
+    for item in items:
+        if "runslow" in item.keywords:
+            item.add_marker(skip_runslow)
+
+
 # Custom markers for test categorization
 def pytest_configure(config):
-    """Configure custom pytest markers."""
+    """Configure custom pytest markers and put templates/ on sys.path once per run."""
+    templates_dir = str(Path(__file__).parent.parent / 'templates')
+    if templates_dir not in sys.path:
+        sys.path.insert(0, templates_dir)
+
     config.addinivalue_line("markers", "unit: Unit tests")
     config.addinivalue_line("markers", "integration: Integration tests") 
     config.addinivalue_line("markers", "slow: Slow running tests")
+    config.addinivalue_line("markers", "runslow: Large-scale variants, only run with --runslow")
+    config.addinivalue_line("markers", "serial: Tests that must not share a run with other workers")
+    config.addinivalue_line("markers", "real_sleep: Opt out of the no-op time.sleep auto-fixture")
     config.addinivalue_line("markers", "network: Tests requiring network access")
     config.addinivalue_line("markers", "cli: Command line interface tests")
     config.addinivalue_line("markers", "api: API interaction tests")
\ No newline at end of file
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Assertion helpers and test doubles shared by the test modules.
+
+Import them with ``from helpers import ...``; conftest.py puts tests/ on sys.path.
+"""
+
+import io
+
+
+class FakeOpen:
+    """Minimal stand-in for builtins.open when testing report writers.
+
+    Records each call's arguments and hands out a StringIO that is emptied on
+    every open, mirroring mode 'w'; read the last write from ``buffer``.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.buffer = io.StringIO()
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return self
+
+    def __enter__(self):
+        return self.buffer
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def assert_all_in(text: str, needles) -> None:
+    """Assert that every needle occurs in text, reporting all missing ones at once."""
+    missing = [needle for needle in needles if needle not in text]
+    assert not missing, f"missing: {missing}"
+
+
+def assert_stdout_contains(capsys, needle: str) -> None:
+    """Assert that captured stdout contains needle, showing its tail on failure."""
+    out = capsys.readouterr().out
+    assert needle in out, out[-500:]
@@ -4,19 +4,95 @@ Tests for content_previewer.py - Content Preview Tool for Azure DevOps to MediaW
 """
 
 import os
+import re
 import sys
 import json
-from unittest.mock import MagicMock, patch, mock_open
+from collections import ChainMap
+from unittest.mock import MagicMock, create_autospec, patch
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 import requests
 
-# Add the migration directory to the path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'migration'))
+from helpers import FakeOpen, assert_all_in, assert_stdout_contains
+
+# Add the migration directory to the path once, even if this module is re-imported by a worker
+_MIGRATION_DIR = str(Path(__file__).parent.parent / 'migration')
+if _MIGRATION_DIR not in sys.path:
+    sys.path.insert(0, _MIGRATION_DIR)
 from content_previewer import ContentConverter, ContentPreviewer, load_config, main
 
 
+# Markdown exercising tables, nested formatting, escapes and unicode for the converter edge-case test
+_EDGE_CASE_CONTENT = '''# Complex Edge Cases
+
+## Table with pipes in content
+| Column | Data with | in it |
+|--------|-----------|--------|
+| Test   | Value|2  | More|  |
+
+## Mixed formatting
+This has **bold with `code` inside** and *italic with [link](url) inside*.
+
+## Escaped characters
+Code with \\`backticks\\` and \\*asterisks\\* and \\[brackets\\].
+
+## Empty sections
+
+## Multiple blank lines
+
+
+
+## Unicode content
+Unicode: 🚀 ✨ 📊 → ← ↑ ↓
+
+## Complex code block
+```python
+def complex_function():
+    """
+    Docstring with **markdown** in it.
+    """
+    # Comment with `backticks`
+    return f"String with {variable} and **bold**"
+```
+'''
+
+
+@pytest.fixture(scope="module")
+def previewer():
+    """Module-wide ContentPreviewer; tests patch its session and methods per test."""
+    return ContentPreviewer("test-org", "test-project", "test-pat")
+
+
+@pytest.fixture(scope="session")
+def converter():
+    """Session-wide ContentConverter; it holds no state between conversions."""
+    return ContentConverter()
+
+
+@pytest.fixture(autouse=True)
+def sleep_calls(request, monkeypatch):
+    """Auto-fixture recording retry back-off sleeps instead of sleeping, unless marked real_sleep."""
+    calls = []
+    if 'real_sleep' not in request.keywords:
+        monkeypatch.setattr('content_previewer.time.sleep', calls.append)
+    return calls
+
+
+@pytest.fixture(scope="session")
+def _previewer_template():
+    """Autospec'd ContentPreviewer instance, built once and reset for every test."""
+    return create_autospec(ContentPreviewer, instance=True)
+
+
+@pytest.fixture
+def previewer_mock(_previewer_template):
+    """Fixture providing the shared ContentPreviewer mock with no configured behaviour or calls."""
+    _previewer_template.reset_mock(return_value=True, side_effect=True)
+    return _previewer_template
+
+
 @pytest.mark.unit
 class TestContentConverter:
     """Test ContentConverter functionality for detailed conversion analysis."""
@@ -224,10 +300,8 @@ This is a simple page with **bold** and *italic* text.
 class TestContentPreviewer:
     """Test ContentPreviewer class functionality."""
     
-    def test_init_success(self):
+    def test_init_success(self, previewer):
         """Test successful ContentPreviewer initialization."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         assert previewer.organization == "test-org"
         assert previewer.project == "test-project"
         assert previewer.pat == "test-pat"
@@ -236,47 +310,37 @@ class TestContentPreviewer:
         assert "MediaWiki-Content-Previewer" in previewer.session.headers['User-Agent']
         assert previewer.converter is not None
     
-    def test_make_api_request_success(self, mock_azure_api_response):
+    def test_make_api_request_success(self, previewer, mock_azure_api_response):
         """Test successful API request."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         with patch.object(previewer.session, 'get') as mock_get:
-            mock_response = MagicMock()
-            mock_response.json.return_value = mock_azure_api_response['wikis']
-            mock_response.raise_for_status.return_value = None
-            mock_get.return_value = mock_response
+            wikis = mock_azure_api_response['wikis']
+            mock_get.return_value = SimpleNamespace(json=lambda: wikis, raise_for_status=lambda: None)
             
             result = previewer._make_api_request('GET', 'https://example.com/api')
             
         assert result == mock_azure_api_response['wikis']
     
-    def test_make_api_request_retry_logic(self, capsys):
+    def test_make_api_request_retry_logic(self, previewer, sleep_calls, capsys):
         """Test API request retry logic."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
-        with patch.object(previewer.session, 'get') as mock_get, \
-             patch('time.sleep') as mock_sleep:
+        with patch.object(previewer.session, 'get') as mock_get:
             
             mock_get.side_effect = [
                 requests.exceptions.Timeout("Timed out"),
                 requests.exceptions.ConnectionError("Connection failed"),
-                MagicMock(json=lambda: {"success": True}, raise_for_status=lambda: None)
+                SimpleNamespace(json=lambda: {"success": True}, raise_for_status=lambda: None)
             ]
             
             result = previewer._make_api_request('GET', 'https://example.com/api')
             
         assert result == {"success": True}
         assert mock_get.call_count == 3
-        assert mock_sleep.call_count == 2
+        assert len(sleep_calls) == 2
         
-        captured = capsys.readouterr()
-        assert "Request timed out, retrying" in captured.out
-        assert "Connection error, retrying" in captured.out
+        out = capsys.readouterr().out
+        assert_all_in(out, ("Request timed out, retrying", "Connection error, retrying"))
     
-    def test_get_wikis_success(self, mock_azure_api_response):
+    def test_get_wikis_success(self, previewer, mock_azure_api_response):
         """Test successful wiki retrieval."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         with patch.object(previewer, '_make_api_request') as mock_request:
             mock_request.return_value = mock_azure_api_response['wikis']
             
@@ -285,10 +349,8 @@ class TestContentPreviewer:
         assert len(wikis) == 1
         assert wikis[0]['name'] == 'TestWiki'
     
-    def test_get_wiki_pages_success(self, mock_azure_api_response):
+    def test_get_wiki_pages_success(self, previewer, mock_azure_api_response):
         """Test successful wiki pages retrieval."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         with patch.object(previewer, '_make_api_request') as mock_request:
             mock_request.return_value = mock_azure_api_response['pages']
             
@@ -297,15 +359,11 @@ class TestContentPreviewer:
         assert len(pages) == 3
         assert pages[0]['path'] == '/Home'
     
-    def test_get_page_content_success(self, mock_azure_api_response):
+    def test_get_page_content_success(self, previewer, mock_azure_api_response):
         """Test successful page content retrieval."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         with patch.object(previewer.session, 'get') as mock_get:
-            mock_response = MagicMock()
-            mock_response.json.return_value = {'content': mock_azure_api_response['page_content']['page-1']}
-            mock_response.raise_for_status.return_value = None
-            mock_get.return_value = mock_response
+            payload = {'content': mock_azure_api_response['page_content']['page-1']}
+            mock_get.return_value = SimpleNamespace(json=lambda: payload, raise_for_status=lambda: None)
             
             content = previewer.get_page_content("wiki-123", "page-1")
             
@@ -317,10 +375,8 @@ class TestContentPreviewer:
 class TestPagePreviewing:
     """Test individual page previewing functionality."""
     
-    def test_preview_page_success(self, mock_azure_api_response, sample_markdown_content):
+    def test_preview_page_success(self, previewer, mock_azure_api_response, sample_markdown_content):
         """Test successful page preview."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         with patch.object(previewer, 'get_wiki_pages') as mock_get_pages, \
              patch.object(previewer, 'get_page_content') as mock_get_content:
             
@@ -339,20 +395,16 @@ class TestPagePreviewing:
         assert "= Main Title =" in preview['converted_content']
         assert "'''bold'''" in preview['converted_content']
     
-    def test_preview_page_not_found(self, mock_azure_api_response):
+    def test_preview_page_not_found(self, previewer, mock_azure_api_response):
         """Test preview when page is not found."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         with patch.object(previewer, 'get_wiki_pages') as mock_get_pages:
             mock_get_pages.return_value = mock_azure_api_response['pages']['value']
             
             with pytest.raises(ValueError, match="Page not found: /NonExistent"):
                 previewer.preview_page("wiki-123", "/NonExistent")
     
-    def test_preview_page_empty_content(self, mock_azure_api_response):
+    def test_preview_page_empty_content(self, previewer, mock_azure_api_response):
         """Test preview with empty page content."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         with patch.object(previewer, 'get_wiki_pages') as mock_get_pages, \
              patch.object(previewer, 'get_page_content') as mock_get_content:
             
@@ -366,10 +418,8 @@ class TestPagePreviewing:
         assert preview['converted_content'] == ''
         assert 'Page is empty' in preview['conversion_issues']['info']
     
-    def test_preview_page_case_insensitive(self, mock_azure_api_response, sample_markdown_content):
+    def test_preview_page_case_insensitive(self, previewer, mock_azure_api_response, sample_markdown_content):
         """Test preview with case-insensitive page matching."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         with patch.object(previewer, 'get_wiki_pages') as mock_get_pages, \
              patch.object(previewer, 'get_page_content') as mock_get_content:
             
@@ -387,10 +437,8 @@ class TestPagePreviewing:
 class TestSamplePagePreviewing:
     """Test sample pages previewing functionality."""
     
-    def test_preview_sample_pages_success(self, mock_azure_api_response, complex_wiki_structure, capsys):
+    def test_preview_sample_pages_success(self, previewer, mock_azure_api_response, complex_wiki_structure, capsys):
         """Test successful sample pages preview."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         with patch.object(previewer, 'get_wiki_pages') as mock_get_pages, \
              patch.object(previewer, 'get_page_content') as mock_get_content:
             
@@ -415,13 +463,10 @@ class TestSamplePagePreviewing:
         assert len(previews) <= 3  # Should not exceed sample size
         assert all(preview['preview_available'] for preview in previews)
         
-        captured = capsys.readouterr()
-        assert "Previewed:" in captured.out
+        assert_stdout_contains(capsys, "Previewed:")
     
-    def test_preview_sample_pages_empty_wiki(self):
+    def test_preview_sample_pages_empty_wiki(self, previewer):
         """Test sample pages preview with empty wiki."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         with patch.object(previewer, 'get_wiki_pages') as mock_get_pages:
             mock_get_pages.return_value = []
             
@@ -429,10 +474,8 @@ class TestSamplePagePreviewing:
             
         assert previews == []
     
-    def test_preview_sample_pages_with_errors(self, mock_azure_api_response, capsys):
+    def test_preview_sample_pages_with_errors(self, previewer, mock_azure_api_response, capsys):
         """Test sample pages preview with some pages failing."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         with patch.object(previewer, 'get_wiki_pages') as mock_get_pages, \
              patch.object(previewer, 'get_page_content') as mock_get_content:
             
@@ -454,13 +497,10 @@ class TestSamplePagePreviewing:
         # Should have some previews despite errors
         assert len(previews) >= 1
         
-        captured = capsys.readouterr()
-        assert "Error previewing" in captured.out
+        assert_stdout_contains(capsys, "Error previewing")
     
-    def test_preview_sample_pages_content_length_selection(self, mock_azure_api_response):
+    def test_preview_sample_pages_content_length_selection(self, previewer, mock_azure_api_response):
         """Test that sample pages selection considers content length diversity."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         # Create pages with different content lengths
         pages_data = [
             {'id': 'short', 'path': '/Short'},
@@ -500,16 +540,18 @@ class TestSamplePagePreviewing:
         
         # Should not include empty page
         assert '/Empty' not in preview_paths
+        
+        # Each page is listed once and its content fetched at most once
+        mock_get_pages.assert_called_once_with("wiki-123")
+        assert mock_get_content.call_count == len(pages_data)
 
 
 @pytest.mark.unit
 class TestReportGeneration:
     """Test preview report generation functionality."""
     
-    def test_generate_preview_report_success(self):
+    def test_generate_preview_report_success(self, previewer):
         """Test successful preview report generation."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         # Mock preview data with various complexity levels
         mock_previews = [
             {
@@ -556,18 +598,14 @@ class TestReportGeneration:
         assert "✅ Next Steps" in report
         assert "azure_devops_migrator.py" in report
     
-    def test_generate_preview_report_empty_previews(self):
+    def test_generate_preview_report_empty_previews(self, previewer):
         """Test report generation with no previews."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         report = previewer.generate_preview_report([], "EmptyWiki")
         
         assert "No previews available" in report
     
-    def test_generate_preview_report_no_issues(self):
+    def test_generate_preview_report_no_issues(self, previewer):
         """Test report generation when no issues are found."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         clean_previews = [
             {
                 'page_info': {'path': '/CleanPage'},
@@ -587,10 +625,8 @@ class TestReportGeneration:
         assert "**Pages needing manual review**: 0" in report
         assert "**Pages with warnings**: 0" in report
     
-    def test_generate_preview_report_content_truncation(self):
+    def test_generate_preview_report_content_truncation(self, previewer):
         """Test that long content is properly truncated in report."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
-        
         long_content = "# Long Content\n\n" + "This is a very long line of content. " * 50
         
         long_preview = [
@@ -640,285 +676,257 @@ class TestConfigurationLoading:
             with pytest.raises(SystemExit):
                 load_config()
                 
-        captured = capsys.readouterr()
-        assert "Missing required environment variables" in captured.out
-        assert "AZURE_DEVOPS_ORGANIZATION" in captured.out
-        assert "AZURE_DEVOPS_PROJECT" in captured.out
-        assert "AZURE_DEVOPS_PAT" in captured.out
+        out = capsys.readouterr().out
+        assert_all_in(out, (
+            "Missing required environment variables",
+            "AZURE_DEVOPS_ORGANIZATION",
+            "AZURE_DEVOPS_PROJECT",
+            "AZURE_DEVOPS_PAT",
+        ))
+
+
+def _preview(path, original, converted, warnings=(), manual_review_needed=(), info=()):
+    """Build a plain preview record shaped like ContentPreviewer._build_preview() output."""
+    return {
+        'page_info': {'path': path},
+        'original_content': original,
+        'converted_content': converted,
+        'conversion_issues': {
+            'warnings': list(warnings),
+            'manual_review_needed': list(manual_review_needed),
+            'info': list(info),
+        },
+    }
+
+
+# Printed by main() once the report is saved; the summary follows it
+_SUMMARY_MARKER = "Preview complete!"
+
+# Scenarios for TestMainFunction.test_main_scenarios. Optional keys:
+#   env/unset      - environment overrides applied on top of mock_env_vars
+#   wikis          - get_wikis() result (defaults to the mock Azure wiki list)
+#   inputs         - answers fed to successive input() prompts
+#   previews       - preview_sample_pages() result
+#   page_error     - exception raised by preview_page()
+#   previewer_error - exception raised when ContentPreviewer is constructed
+#   expect_exit    - main() is expected to call sys.exit()
+_MAIN_SCENARIOS = (
+    {
+        'name': 'page_not_found',
+        'inputs': ('1', '/NonExistent'),
+        'page_error': ValueError("Page not found: /NonExistent"),
+        'expected': "Page not found: /NonExistent",
+    },
+    {
+        'name': 'no_wikis_found',
+        'wikis': [],
+        'expected': "No wikis found",
+    },
+    {
+        'name': 'wiki_not_found',
+        'env': {'AZURE_WIKI_NAME': 'NonExistentWiki'},
+        'expected': "Wiki 'NonExistentWiki' not found",
+    },
+    {
+        'name': 'configuration_error',
+        'unset': ('AZURE_DEVOPS_ORGANIZATION', 'AZURE_DEVOPS_PROJECT', 'AZURE_DEVOPS_PAT'),
+        'expect_exit': True,
+        'expected': "Missing required environment variables",
+    },
+    {
+        'name': 'general_error',
+        'previewer_error': Exception("General error"),
+        'expect_exit': True,
+        'expected': "Preview failed",
+    },
+    {
+        'name': 'no_issues_summary',
+        'inputs': ('2', '1'),
+        'previews': (_preview('/Clean', "# Clean\nContent here.", "= Clean =\nContent here."),),
+        'expected': "No major issues found - migration should be smooth!",
+    },
+    {
+        'name': 'with_issues_summary',
+        'inputs': ('2', '1'),
+        'previews': (
+            _preview('/Issues', "# Issues\n![Image](img.png)", "= Issues =\n![Image](img.png)",
+                     warnings=['HTML issue'], manual_review_needed=['Image issue']),
+        ),
+        'expected': "Found 2 potential issues - review the report",
+    },
+)
+
+
+# Every scenario's expected message, so one pass finds which of them main() printed
+_SCENARIO_MESSAGES = re.compile('|'.join(re.escape(scenario['expected']) for scenario in _MAIN_SCENARIOS))
+
+
+def _feed_input(monkeypatch, *answers):
+    """Answer successive input() prompts with the given strings."""
+    replies = iter(answers)
+    monkeypatch.setattr('builtins.input', lambda *_args: next(replies))
+
+
+def _install_previewer_class(monkeypatch, instance=None, **kwargs):
+    """Replace content_previewer.ContentPreviewer with a MagicMock class and return it.
+
+    The class returns ``instance`` when one is given, normally the previewer_mock fixture.
+    """
+    if instance is not None:
+        kwargs['return_value'] = instance
+    mock_previewer_class = MagicMock(**kwargs)
+    monkeypatch.setattr('content_previewer.ContentPreviewer', mock_previewer_class)
+    return mock_previewer_class
 
 
 @pytest.mark.integration
 class TestMainFunction:
     """Test main function integration."""
     
-    def test_main_success_flow_sample_pages(self, mock_env_vars, mock_azure_api_response, temp_directory, monkeypatch):
+    def test_main_success_flow_sample_pages(self, patched_env, mock_azure_api_response, tmp_path, monkeypatch, previewer_mock):
         """Test successful main function execution with sample pages."""
-        monkeypatch.chdir(temp_directory)
-        
-        with patch.dict(os.environ, mock_env_vars), \
-             patch('content_previewer.ContentPreviewer') as mock_previewer_class, \
-             patch('builtins.input', side_effect=['2', '3']), \
-             patch('builtins.open', mock_open()) as mock_file:
-            
-            mock_previewer = mock_previewer_class.return_value
-            mock_previewer.get_wikis.return_value = mock_azure_api_response['wikis']['value']
-            
-            # Mock sample preview results
-            mock_previews = [
-                {
-                    'page_info': {'path': '/Home'},
-                    'original_content': "# Home\nContent here.",
-                    'converted_content': "= Home =\nContent here.",
-                    'conversion_issues': {'warnings': [], 'manual_review_needed': [], 'info': []}
-                }
-            ]
-            mock_previewer.preview_sample_pages.return_value = mock_previews
-            mock_previewer.generate_preview_report.return_value = "Test Preview Report"
-            
+        monkeypatch.chdir(tmp_path)
+        mock_previewer_class = _install_previewer_class(monkeypatch, previewer_mock)
+        _feed_input(monkeypatch, '2', '3')
+        
+        mock_previewer = mock_previewer_class.return_value
+        mock_previewer.get_wikis.return_value = mock_azure_api_response['wikis']['value']
+        
+        # Mock sample preview results
+        mock_previewer.preview_sample_pages.return_value = (
+            _preview('/Home', "# Home\nContent here.", "= Home =\nContent here."),
+        )
+        mock_previewer.generate_preview_report.return_value = "Test Preview Report"
+        
+        # builtins.open is only swapped around main() so pytest's own file access is unaffected
+        fake_open = FakeOpen()
+        with monkeypatch.context() as scoped:
+            scoped.setattr('builtins.open', fake_open)
             main()
-            
+        
         # Verify previewer was created and methods called
         mock_previewer_class.assert_called_once_with("test-org", "test-project", "test-pat-token-123")
         mock_previewer.preview_sample_pages.assert_called_once_with(mock_azure_api_response['wikis']['value'][0]['id'], 3)
         mock_previewer.generate_preview_report.assert_called_once()
         
         # Verify file was written
-        mock_file.assert_called_once_with("content_preview_report.md", "w", encoding='utf-8')
+        assert fake_open.calls == [(("content_preview_report.md", "w"), {'encoding': 'utf-8'})]
+        assert fake_open.buffer.getvalue() == "Test Preview Report"
     
-    def test_main_success_flow_specific_page(self, mock_env_vars, mock_azure_api_response, temp_directory, monkeypatch, capsys):
+    def test_main_success_flow_specific_page(self, patched_env, mock_azure_api_response, tmp_path, monkeypatch, previewer_mock, capsys):
         """Test successful main function execution with specific page."""
-        monkeypatch.chdir(temp_directory)
-        
-        with patch.dict(os.environ, mock_env_vars), \
-             patch('content_previewer.ContentPreviewer') as mock_previewer_class, \
-             patch('builtins.input', side_effect=['1', '/Home']), \
-             patch('builtins.open', mock_open()) as mock_file:
-            
-            mock_previewer = mock_previewer_class.return_value
-            mock_previewer.get_wikis.return_value = mock_azure_api_response['wikis']['value']
-            
-            # Mock specific page preview
-            mock_preview = {
-                'page_info': {'path': '/Home'},
-                'original_content': "# Home\nContent here.",
-                'converted_content': "= Home =\nContent here.",
-                'conversion_issues': {'warnings': [], 'manual_review_needed': [], 'info': []}
-            }
-            mock_previewer.preview_page.return_value = mock_preview
-            mock_previewer.generate_preview_report.return_value = "Test Preview Report"
-            
+        monkeypatch.chdir(tmp_path)
+        mock_previewer_class = _install_previewer_class(monkeypatch, previewer_mock)
+        _feed_input(monkeypatch, '1', '/Home')
+        
+        mock_previewer = mock_previewer_class.return_value
+        mock_previewer.get_wikis.return_value = mock_azure_api_response['wikis']['value']
+        
+        # Mock specific page preview
+        mock_preview = {
+            'page_info': {'path': '/Home'},
+            'original_content': "# Home\nContent here.",
+            'converted_content': "= Home =\nContent here.",
+            'conversion_issues': {'warnings': [], 'manual_review_needed': [], 'info': []}
+        }
+        mock_previewer.preview_page.return_value = mock_preview
+        mock_previewer.generate_preview_report.return_value = "Test Preview Report"
+        
+        with monkeypatch.context() as scoped:
+            scoped.setattr('builtins.open', FakeOpen())
             main()
-            
+        
         mock_previewer.preview_page.assert_called_once_with(mock_azure_api_response['wikis']['value'][0]['id'], '/Home')
         
-        captured = capsys.readouterr()
-        assert "Previewed page: /Home" in captured.out
-    
-    def test_main_page_not_found_error(self, mock_env_vars, mock_azure_api_response, capsys):
-        """Test main function when specific page is not found."""
-        with patch.dict(os.environ, mock_env_vars), \
-             patch('content_previewer.ContentPreviewer') as mock_previewer_class, \
-             patch('builtins.input', side_effect=['1', '/NonExistent']):
-            
-            mock_previewer = mock_previewer_class.return_value
-            mock_previewer.get_wikis.return_value = mock_azure_api_response['wikis']['value']
-            mock_previewer.preview_page.side_effect = ValueError("Page not found: /NonExistent")
-            
-            main()
-            
-        captured = capsys.readouterr()
-        assert "Page not found: /NonExistent" in captured.out
-    
-    def test_main_no_wikis_found(self, mock_env_vars, capsys):
-        """Test main function when no wikis are found."""
-        with patch.dict(os.environ, mock_env_vars), \
-             patch('content_previewer.ContentPreviewer') as mock_previewer_class:
-            
-            mock_previewer = mock_previewer_class.return_value
-            mock_previewer.get_wikis.return_value = []
-            
-            main()
-            
-        captured = capsys.readouterr()
-        assert "No wikis found" in captured.out
-    
-    def test_main_wiki_not_found(self, mock_env_vars, mock_azure_api_response, capsys):
-        """Test main function when specified wiki is not found."""
-        env_with_specific_wiki = mock_env_vars.copy()
-        env_with_specific_wiki['AZURE_WIKI_NAME'] = 'NonExistentWiki'
+        assert_stdout_contains(capsys, "Previewed page: /Home")
+    
+    @pytest.mark.parametrize("scenario", _MAIN_SCENARIOS, ids=lambda scenario: scenario['name'])
+    def test_main_scenarios(self, scenario, mock_env_vars, mock_azure_api_response, previewer_mock,
+                            tmp_path, monkeypatch, capsys):
+        """Test main function outcomes driven by _MAIN_SCENARIOS."""
+        monkeypatch.chdir(tmp_path)
+        # Overlay the scenario's overrides on the shared read-only env without copying it
+        env = ChainMap(scenario.get('env', {}), mock_env_vars)
+        unset = scenario.get('unset', ())
+        for key, value in env.items():
+            if key in unset:
+                monkeypatch.delenv(key, raising=False)
+            else:
+                monkeypatch.setenv(key, value)
+        
+        if 'previewer_error' in scenario:
+            _install_previewer_class(monkeypatch, side_effect=scenario['previewer_error'])
+        else:
+            _install_previewer_class(monkeypatch, previewer_mock)
+            previewer_mock.get_wikis.return_value = scenario.get('wikis', mock_azure_api_response['wikis']['value'])
+            previewer_mock.preview_page.side_effect = scenario.get('page_error')
+            previewer_mock.preview_sample_pages.return_value = scenario.get('previews', ())
+            previewer_mock.generate_preview_report.return_value = "Preview Report"
+        _feed_input(monkeypatch, *scenario.get('inputs', ()))
+        
+        fake_open = FakeOpen()
+        with monkeypatch.context() as scoped:
+            scoped.setattr('builtins.open', fake_open)
+            if scenario.get('expect_exit'):
+                with pytest.raises(SystemExit):
+                    main()
+            else:
+                main()
         
-        with patch.dict(os.environ, env_with_specific_wiki), \
-             patch('content_previewer.ContentPreviewer') as mock_previewer_class:
-            
-            mock_previewer = mock_previewer_class.return_value
-            mock_previewer.get_wikis.return_value = mock_azure_api_response['wikis']['value']
-            
-            main()
-            
-        captured = capsys.readouterr()
-        assert "Wiki 'NonExistentWiki' not found" in captured.out
+        # Summary lines follow the completion marker; outputs without it are kept whole
+        out = capsys.readouterr().out.rpartition(_SUMMARY_MARKER)[2]
+        assert set(_SCENARIO_MESSAGES.findall(out)) == {scenario['expected']}
+        # A report is written exactly when there were previews to report on
+        assert fake_open.buffer.getvalue() == ("Preview Report" if scenario.get('previews') else "")
     
-    def test_main_missing_dependencies(self, capsys):
+    def test_main_missing_dependencies(self, monkeypatch, capsys):
         """Test main function with missing dependencies."""
-        with patch('builtins.__import__', side_effect=ImportError("No module named 'requests'")):
-            with pytest.raises(SystemExit):
-                main()
-                
-        captured = capsys.readouterr()
-        assert "Required package not installed" in captured.out
-    
-    def test_main_configuration_error(self, capsys):
-        """Test main function with configuration error."""
-        with patch.dict(os.environ, {}, clear=True):
-            with pytest.raises(SystemExit):
-                main()
-                
-        captured = capsys.readouterr()
-        assert "Missing required environment variables" in captured.out
-    
-    def test_main_general_error(self, mock_env_vars, capsys):
-        """Test main function with general error."""
-        with patch.dict(os.environ, mock_env_vars), \
-             patch('content_previewer.ContentPreviewer', side_effect=Exception("General error")):
-            
-            with pytest.raises(SystemExit):
-                main()
-                
-        captured = capsys.readouterr()
-        assert "Preview failed" in captured.out
-    
-    def test_main_no_issues_summary(self, mock_env_vars, mock_azure_api_response, temp_directory, monkeypatch, capsys):
-        """Test main function summary when no issues are found."""
-        monkeypatch.chdir(temp_directory)
-        
-        with patch.dict(os.environ, mock_env_vars), \
-             patch('content_previewer.ContentPreviewer') as mock_previewer_class, \
-             patch('builtins.input', side_effect=['2', '1']), \
-             patch('builtins.open', mock_open()) as mock_file:
-            
-            mock_previewer = mock_previewer_class.return_value
-            mock_previewer.get_wikis.return_value = mock_azure_api_response['wikis']['value']
-            
-            # Mock clean preview with no issues
-            mock_previews = [
-                {
-                    'page_info': {'path': '/Clean'},
-                    'original_content': "# Clean\nContent here.",
-                    'converted_content': "= Clean =\nContent here.",
-                    'conversion_issues': {'warnings': [], 'manual_review_needed': [], 'info': []}
-                }
-            ]
-            mock_previewer.preview_sample_pages.return_value = mock_previews
-            mock_previewer.generate_preview_report.return_value = "Clean Report"
-            
-            main()
-            
-        captured = capsys.readouterr()
-        assert "No major issues found - migration should be smooth!" in captured.out
-    
-    def test_main_with_issues_summary(self, mock_env_vars, mock_azure_api_response, temp_directory, monkeypatch, capsys):
-        """Test main function summary when issues are found."""
-        monkeypatch.chdir(temp_directory)
-        
-        with patch.dict(os.environ, mock_env_vars), \
-             patch('content_previewer.ContentPreviewer') as mock_previewer_class, \
-             patch('builtins.input', side_effect=['2', '1']), \
-             patch('builtins.open', mock_open()) as mock_file:
-            
-            mock_previewer = mock_previewer_class.return_value
-            mock_previewer.get_wikis.return_value = mock_azure_api_response['wikis']['value']
-            
-            # Mock preview with issues
-            mock_previews = [
-                {
-                    'page_info': {'path': '/Issues'},
-                    'original_content': "# Issues\n![Image](img.png)",
-                    'converted_content': "= Issues =\n![Image](img.png)",
-                    'conversion_issues': {
-                        'warnings': ['HTML issue'],
-                        'manual_review_needed': ['Image issue'],
-                        'info': []
-                    }
-                }
-            ]
-            mock_previewer.preview_sample_pages.return_value = mock_previews
-            mock_previewer.generate_preview_report.return_value = "Issues Report"
-            
+        # A None entry in sys.modules makes 'import requests' raise ImportError
+        monkeypatch.setitem(sys.modules, 'requests', None)
+        
+        with pytest.raises(SystemExit):
             main()
-            
-        captured = capsys.readouterr()
-        assert "Found 2 potential issues - review the report" in captured.out
+                
+        assert_stdout_contains(capsys, "Required package not installed")
 
 
 @pytest.mark.api
 class TestApiIntegrationScenarios:
     """Test API integration scenarios and edge cases."""
     
-    def test_rate_limiting_handling(self, capsys):
+    def test_rate_limiting_handling(self, previewer, sleep_calls, monkeypatch, capsys):
         """Test handling of API rate limiting."""
-        previewer = ContentPreviewer("test-org", "test-project", "test-pat")
+        # Mock rate limit response
+        def raise_rate_limited():
+            raise requests.exceptions.HTTPError(response=rate_limited_response)
         
-        with patch.object(previewer.session, 'get') as mock_get, \
-             patch('time.sleep') as mock_sleep:
-            
-            # Mock rate limit response
-            rate_limited_response = MagicMock()
-            rate_limited_response.status_code = 429
-            rate_limited_response.headers = {'Retry-After': '30'}
-            rate_limited_response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=rate_limited_response)
-            
-            success_response = MagicMock()
-            success_response.json.return_value = {"success": True}
-            success_response.raise_for_status.return_value = None
-            
-            mock_get.side_effect = [rate_limited_response, success_response]
-            
-            result = previewer._make_api_request('GET', 'https://example.com/api')
+        rate_limited_response = SimpleNamespace(
+            status_code=429, headers={'Retry-After': '30'}, raise_for_status=raise_rate_limited
+        )
+        success_response = SimpleNamespace(
+            status_code=200, headers={}, json=lambda: {"success": True}, raise_for_status=lambda: None
+        )
+        
+        responses = [rate_limited_response, success_response]
+        requested_urls = []
+        
+        def fake_get(url, **kwargs):
+            requested_urls.append(url)
+            return responses[len(requested_urls) - 1]
+        
+        monkeypatch.setattr(previewer.session, 'get', fake_get)
+        
+        result = previewer._make_api_request('GET', 'https://example.com/api')
             
         assert result == {"success": True}
-        mock_sleep.assert_called_once_with(30)
+        assert requested_urls == ['https://example.com/api'] * 2
+        assert sleep_calls == [30]
         
-        captured = capsys.readouterr()
-        assert "Rate limited, waiting 30s" in captured.out
+        assert_stdout_contains(capsys, "Rate limited, waiting 30s")
     
-    def test_complex_content_conversion_edge_cases(self):
+    def test_complex_content_conversion_edge_cases(self, converter):
         """Test content conversion with complex edge cases."""
-        converter = ContentConverter()
-        
-        edge_case_content = '''# Complex Edge Cases
-
-## Table with pipes in content
-| Column | Data with | in it |
-|--------|-----------|--------|
-| Test   | Value|2  | More|  |
-
-## Mixed formatting
-This has **bold with `code` inside** and *italic with [link](url) inside*.
-
-## Escaped characters
-Code with \\`backticks\\` and \\*asterisks\\* and \\[brackets\\].
-
-## Empty sections
-
-## Multiple blank lines
-
-
-
-## Unicode content
-Unicode: 🚀 ✨ 📊 → ← ↑ ↓
-
-## Complex code block
-```python
-def complex_function():
-    """
-    Docstring with **markdown** in it.
-    """
-    # Comment with `backticks`
-    return f"String with {variable} and **bold**"
-```
-'''
-        
-        result = converter.markdown_to_mediawiki(edge_case_content)
+        result = converter.markdown_to_mediawiki(_EDGE_CASE_CONTENT)
         
         # Should not crash and should handle edge cases reasonably
         assert "= Complex Edge Cases =" in result
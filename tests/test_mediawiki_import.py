@@ -4,33 +4,143 @@ Tests for mediawiki_import.py - MediaWiki Template Import Script.
 """
 
 import os
-import sys
-import json
-import glob
+import re
+import logging
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
-from unittest.mock import MagicMock, patch, mock_open
+from types import MappingProxyType
+from unittest.mock import patch
 
 import pytest
 import requests
+import responses
 
-# Add the templates directory to the path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'templates'))
-from mediawiki_import import MediaWikiImporter, load_config, main
+from helpers import assert_all_in
+
+# templates/ is put on sys.path by conftest.pytest_configure
+from mediawiki_import import (MULTIPART_TEXT_THRESHOLD, POOL_MAXSIZE, MediaWikiImporter,
+                              load_config, main)
+
+
+_API_URL = "http://localhost:8080/api.php"
+
+# Error patterns for pytest.raises(match=...), compiled once per module
+_AUTH_ERR = re.compile("Authentication failed")
+_JSON_ERR = re.compile("Invalid JSON response")
+_HTTP_403_ERR = re.compile("HTTP error: 403")
+_TIMEOUT_ERR = re.compile("Request timeout")
+_CONNECTION_ERR = re.compile("Connection failed")
+_SERVER_ERR = re.compile("Server error: 500")
+
+# Retryable API failures: (responses reply kwargs, back-off sleeps across three failed attempts,
+#                           first retry log message, final error, final output)
+_RETRY_FAILURES = (
+    ({'body': requests.exceptions.Timeout("Timed out")}, [1, 2],
+     "⏳ Request timed out, retrying... (attempt 1/3)",
+     _TIMEOUT_ERR, "API request timed out after 3 attempts"),
+    ({'body': requests.exceptions.ConnectionError("Connection failed")}, [1, 2],
+     "⚠️  Connection error, retrying... (attempt 1/3)",
+     _CONNECTION_ERR, "Check MediaWiki URL and network connectivity"),
+    ({'status': 500}, [5, 5],
+     "⚠️  Server error, retrying... (attempt 1/3)",
+     _SERVER_ERR, "Server error: 500"),
+)
+_RETRY_FAILURE_IDS = ("timeout", "connection_error", "server_error")
+
+
+@lru_cache(maxsize=8)
+def _cached_importer(wiki_url, username, password):
+    """One MediaWikiImporter (and pooled session) per credential set for the whole module."""
+    return MediaWikiImporter(wiki_url, username, password)
+
+
+@pytest.fixture
+def importer():
+    """Shared MediaWikiImporter; tests patch its session and methods per test.
+
+    The cached edit token is dropped on teardown so no test inherits another's login.
+    """
+    importer = _cached_importer("http://localhost:8080", "testuser", "testpass")
+    yield importer
+    importer._edit_token = None
+
+
+@pytest.fixture(scope="session")
+def prebuilt_template_dirs(tmp_path_factory):
+    """Read-only template directory layouts, built once and shared by the import tests."""
+    base = tmp_path_factory.mktemp("wiki")
+    layouts = {name: base / name for name in ("empty", "error", "infobox")}
+    for directory in layouts.values():
+        directory.mkdir()
+    (layouts["error"] / "ErrorTemplate.mediawiki").write_text("Template content")
+    (layouts["infobox"] / "Template_InfoBox.mediawiki").write_text("InfoBox template content")
+    return MappingProxyType(layouts)
+
+
+@pytest.fixture(autouse=True)
+def sleep_calls(request, monkeypatch):
+    """Auto-fixture recording retry back-off sleeps instead of sleeping, unless marked real_sleep."""
+    calls = []
+    if 'real_sleep' not in request.keywords:
+        monkeypatch.setattr('mediawiki_import.time.sleep', calls.append)
+    return calls
+
+
+@pytest.fixture
+def api(block_network):
+    """responses mock of the MediaWiki API; every registered reply must be consumed.
+
+    Requests block_network so the mock is installed over, and removed before, its guard.
+    """
+    with responses.RequestsMock() as rsps:
+        yield rsps
+
+
+@pytest.fixture
+def template_env(monkeypatch, mock_env_vars):
+    """Set the importer's environment variables; tests override or delenv single keys on top."""
+    env = {
+        'WIKI_URL': mock_env_vars['WIKI_URL'],
+        'WIKI_USERNAME': mock_env_vars['WIKI_USERNAME'],
+        'WIKI_PASSWORD': mock_env_vars['WIKI_PASSWORD'],
+        'TEMPLATE_DIR': 'test-templates',
+    }
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return env
 
 
 @pytest.mark.unit
 class TestMediaWikiImporter:
     """Test MediaWikiImporter class functionality."""
     
-    def test_init_success(self):
+    def test_init_success(self, importer):
         """Test successful MediaWikiImporter initialization."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
         assert importer.wiki_url == "http://localhost:8080"
         assert importer.username == "testuser"
         assert importer.password == "testpass"
         assert importer.api_url == "http://localhost:8080/api.php"
     
+    def test_session_uses_pooled_adapter(self, importer):
+        """Test that the shared session routes API calls through one pooled adapter."""
+        adapter = importer.session.get_adapter(_API_URL)
+        
+        assert adapter is importer.session.get_adapter("https://localhost:8080/api.php")
+        assert adapter.poolmanager.connection_pool_kw['maxsize'] == POOL_MAXSIZE
+    
+    def test_context_manager_closes_session(self):
+        """Test that leaving the with-block closes the pooled session."""
+        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
+        
+        with patch.object(importer.session, 'close') as mock_close:
+            with importer as entered:
+                assert entered is importer
+                mock_close.assert_not_called()
+            
+        mock_close.assert_called_once()
+    
     def test_init_url_normalization(self):
         """Test that URLs are properly normalized."""
         importer = MediaWikiImporter("http://localhost:8080/", "testuser", "testpass")
@@ -43,133 +153,66 @@ class TestMediaWikiImporter:
 class TestApiRequests:
     """Test MediaWiki API request handling."""
     
-    def test_make_request_success_post(self, mock_mediawiki_api_response):
+    def test_make_request_success_post(self, importer, api, mock_mediawiki_api_response):
         """Test successful POST API request."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
+        api.post(_API_URL, json=mock_mediawiki_api_response['login_token'])
         
-        with patch.object(importer.session, 'post') as mock_post:
-            mock_response = MagicMock()
-            mock_response.json.return_value = mock_mediawiki_api_response['login_token']
-            mock_response.raise_for_status.return_value = None
-            mock_post.return_value = mock_response
-            
-            result = importer._make_request("POST", action="query", meta="tokens")
-            
-        assert result == mock_mediawiki_api_response['login_token']
-        mock_post.assert_called_once()
-    
-    def test_make_request_success_get(self, mock_mediawiki_api_response):
-        """Test successful GET API request."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
+        result = importer._make_request("POST", action="query", meta="tokens")
         
-        with patch.object(importer.session, 'get') as mock_get:
-            mock_response = MagicMock()
-            mock_response.json.return_value = mock_mediawiki_api_response['login_token']
-            mock_response.raise_for_status.return_value = None
-            mock_get.return_value = mock_response
-            
-            result = importer._make_request("GET", action="query", meta="tokens")
-            
         assert result == mock_mediawiki_api_response['login_token']
-        mock_get.assert_called_once()
+        assert len(api.calls) == 1
     
-    def test_make_request_timeout_retry(self, capsys):
-        """Test API request with timeout and retry logic."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
+    @pytest.mark.parametrize("text_size,content_type", [
+        (10, "application/x-www-form-urlencoded"),
+        (MULTIPART_TEXT_THRESHOLD + 1, "multipart/form-data"),
+    ], ids=("small_text", "large_text"))
+    def test_make_request_post_encoding(self, importer, api, text_size, content_type):
+        """Test that only large page text is posted as multipart/form-data."""
+        api.post(_API_URL, json={"edit": {"result": "Success"}})
         
-        with patch.object(importer.session, 'post') as mock_post, \
-             patch('time.sleep') as mock_sleep:
-            
-            mock_post.side_effect = [
-                requests.exceptions.Timeout("Timed out"),
-                MagicMock(json=lambda: {"success": True}, raise_for_status=lambda: None)
-            ]
-            
-            result = importer._make_request("POST", action="test")
-            
-        assert result == {"success": True}
-        assert mock_post.call_count == 2
-        mock_sleep.assert_called_once()
+        importer._make_request("POST", action="edit", text="é" * text_size, format="json")
         
-        captured = capsys.readouterr()
-        assert "Request timed out, retrying" in captured.out
+        assert api.calls[0].request.headers['Content-Type'].startswith(content_type)
     
-    def test_make_request_connection_error_retry(self, capsys):
-        """Test API request with connection error and retry."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
+    def test_make_request_success_get(self, importer, api, mock_mediawiki_api_response):
+        """Test successful GET API request."""
+        api.get(_API_URL, json=mock_mediawiki_api_response['login_token'])
         
-        with patch.object(importer.session, 'post') as mock_post, \
-             patch('time.sleep') as mock_sleep:
-            
-            mock_post.side_effect = [
-                requests.exceptions.ConnectionError("Connection failed"),
-                MagicMock(json=lambda: {"success": True}, raise_for_status=lambda: None)
-            ]
-            
-            result = importer._make_request("POST", action="test")
-            
-        assert result == {"success": True}
-        assert mock_post.call_count == 2
-        mock_sleep.assert_called_once()
+        result = importer._make_request("GET", action="query", meta="tokens")
         
-        captured = capsys.readouterr()
-        assert "Connection error, retrying" in captured.out
+        assert result == mock_mediawiki_api_response['login_token']
+        assert len(api.calls) == 1
     
-    def test_make_request_authentication_error(self, capsys):
+    def test_make_request_authentication_error(self, importer, api, capsys):
         """Test API request with authentication error."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
+        api.post(_API_URL, status=401)
         
-        with patch.object(importer.session, 'post') as mock_post:
-            auth_error_response = MagicMock()
-            auth_error_response.status_code = 401
-            auth_error_response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=auth_error_response)
-            mock_post.return_value = auth_error_response
-            
-            with pytest.raises(Exception, match="Authentication failed"):
-                importer._make_request("POST", action="test")
+        with pytest.raises(Exception, match=_AUTH_ERR):
+            importer._make_request("POST", action="test")
                 
         captured = capsys.readouterr()
         assert "Authentication failed" in captured.out
     
-    def test_make_request_server_error_retry(self, capsys):
-        """Test API request with server error and retry."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
+    @pytest.mark.parametrize("failure,backoffs,retry_log,_error,_output", _RETRY_FAILURES, ids=_RETRY_FAILURE_IDS)
+    def test_make_request_retries_then_succeeds(self, importer, api, sleep_calls, caplog,
+                                                failure, backoffs, retry_log, _error, _output):
+        """Test API request that fails once, backs off and succeeds on retry."""
+        api.post(_API_URL, **failure)
+        api.post(_API_URL, json={"success": True})
         
-        with patch.object(importer.session, 'post') as mock_post, \
-             patch('time.sleep') as mock_sleep:
-            
-            # First request: 500 error, second request: success
-            error_response = MagicMock()
-            error_response.status_code = 500
-            error_response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=error_response)
-            
-            success_response = MagicMock()
-            success_response.json.return_value = {"success": True}
-            success_response.raise_for_status.return_value = None
-            
-            mock_post.side_effect = [error_response, success_response]
-            
-            result = importer._make_request("POST", action="test")
-            
-        assert result == {"success": True}
-        assert mock_post.call_count == 2
-        mock_sleep.assert_called_once_with(5)  # Server error wait time
+        result = importer._make_request("POST", action="test")
         
-        captured = capsys.readouterr()
-        assert "Server error, retrying" in captured.out
+        assert result == {"success": True}
+        assert len(api.calls) == 2
+        assert sleep_calls == backoffs[:1]
+        assert caplog.record_tuples == [("mediawiki_import", logging.WARNING, retry_log)]
     
-    def test_make_request_json_decode_error(self, capsys):
+    def test_make_request_json_decode_error(self, importer, api, capsys):
         """Test API request with JSON decode error."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
+        api.post(_API_URL, body="<html><body>Internal error</body></html>")
         
-        with patch.object(importer.session, 'post') as mock_post:
-            mock_response = MagicMock()
-            mock_response.json.side_effect = json.JSONDecodeError("Invalid JSON", "", 0)
-            mock_response.raise_for_status.return_value = None
-            mock_post.return_value = mock_response
-            
-            with pytest.raises(Exception, match="Invalid JSON response"):
-                importer._make_request("POST", action="test")
+        with pytest.raises(Exception, match=_JSON_ERR):
+            importer._make_request("POST", action="test")
                 
         captured = capsys.readouterr()
         assert "Invalid JSON response" in captured.out
@@ -180,69 +223,42 @@ class TestApiRequests:
 class TestTokenHandling:
     """Test MediaWiki token handling functionality."""
     
-    def test_get_login_token_success(self, mock_mediawiki_api_response, capsys):
-        """Test successful login token retrieval."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
-        with patch.object(importer, '_make_request') as mock_request:
-            mock_request.return_value = mock_mediawiki_api_response['login_token']
-            
-            token = importer.get_login_token()
-            
-        assert token == "test-login-token-456"
-        
-        captured = capsys.readouterr()
-        assert "Login token obtained" in captured.out
-    
-    def test_get_login_token_failure(self, capsys):
-        """Test login token retrieval failure."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
-        with patch.object(importer, '_make_request') as mock_request:
-            mock_request.return_value = {"query": {"tokens": {}}}  # No login token
-            
-            with pytest.raises(SystemExit):
-                importer.get_login_token()
-                
-        captured = capsys.readouterr()
-        assert "Failed to get login token" in captured.out
-    
-    def test_get_edit_token_success(self, mock_mediawiki_api_response, capsys):
-        """Test successful edit token retrieval."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
+    @pytest.mark.parametrize("method,fixture_key,expected,output", [
+        ("get_login_token", "login_token", "test-login-token-456", "Login token obtained"),
+        ("get_edit_token", "edit_token", "test-edit-token-789", "Edit token obtained"),
+    ], ids=("login", "edit"))
+    def test_get_token_success(self, importer, mock_mediawiki_api_response, capsys,
+                               method, fixture_key, expected, output):
+        """Test successful token retrieval."""
         with patch.object(importer, '_make_request') as mock_request:
-            mock_request.return_value = mock_mediawiki_api_response['edit_token']
+            mock_request.return_value = mock_mediawiki_api_response[fixture_key]
             
-            token = importer.get_edit_token()
+            token = getattr(importer, method)()
             
-        assert token == "test-edit-token-789"
-        
-        captured = capsys.readouterr()
-        assert "Edit token obtained" in captured.out
+        assert token == expected
+        assert output in capsys.readouterr().out
     
-    def test_get_edit_token_failure(self, capsys):
-        """Test edit token retrieval failure."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
+    @pytest.mark.parametrize("method,output", [
+        ("get_login_token", "Failed to get login token"),
+        ("get_edit_token", "Failed to get edit token"),
+    ], ids=("login", "edit"))
+    def test_get_token_failure(self, importer, capsys, method, output):
+        """Test token retrieval failure when the response carries no token."""
         with patch.object(importer, '_make_request') as mock_request:
-            mock_request.return_value = {"query": {"tokens": {}}}  # No edit token
+            mock_request.return_value = {"query": {"tokens": {}}}  # No token
             
             with pytest.raises(SystemExit):
-                importer.get_edit_token()
+                getattr(importer, method)()
                 
-        captured = capsys.readouterr()
-        assert "Failed to get edit token" in captured.out
+        assert output in capsys.readouterr().out
 
 
 @pytest.mark.unit
 class TestLogin:
     """Test MediaWiki login functionality."""
     
-    def test_login_success(self, mock_mediawiki_api_response, capsys):
+    def test_login_success(self, importer, mock_mediawiki_api_response, capsys):
         """Test successful MediaWiki login."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
         with patch.object(importer, '_make_request') as mock_request:
             mock_request.return_value = mock_mediawiki_api_response['login_success']
             
@@ -253,10 +269,8 @@ class TestLogin:
         captured = capsys.readouterr()
         assert "Successfully logged in" in captured.out
     
-    def test_login_failure(self, capsys):
+    def test_login_failure(self, importer, capsys):
         """Test MediaWiki login failure."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
         failed_login_response = {
             'login': {
                 'result': 'Failed'
@@ -274,10 +288,8 @@ class TestLogin:
         assert "Login failed" in captured.out
         assert "Login result: Failed" in captured.out
     
-    def test_login_wrong_result(self, capsys):
+    def test_login_wrong_result(self, importer, capsys):
         """Test login with unexpected result."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
         unexpected_login_response = {
             'login': {
                 'result': 'NeedToken'
@@ -299,10 +311,8 @@ class TestLogin:
 class TestTemplateImport:
     """Test template import functionality."""
     
-    def test_import_template_success(self, mock_mediawiki_api_response, capsys):
+    def test_import_template_success(self, importer, mock_mediawiki_api_response, capsys):
         """Test successful template import."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
         with patch.object(importer, '_make_request') as mock_request:
             mock_request.return_value = mock_mediawiki_api_response['edit_success']
             
@@ -314,10 +324,8 @@ class TestTemplateImport:
         assert "Importing Template:TestTemplate" in captured.out
         assert "Template:TestTemplate imported successfully" in captured.out
     
-    def test_import_template_failure(self, capsys):
+    def test_import_template_failure(self, importer, capsys):
         """Test template import failure."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
         failed_edit_response = {
             'edit': {
                 'result': 'Failure'
@@ -336,13 +344,32 @@ class TestTemplateImport:
         assert result is False
         
         captured = capsys.readouterr()
-        assert "Failed to import Template:FailedTemplate" in captured.out
-        assert "Error: permission-denied" in captured.out
-    
-    def test_import_template_unknown_error(self, capsys):
+        # Name and error share one line so parallel uploads cannot split them apart
+        assert "Failed to import Template:FailedTemplate - Error: permission-denied" in captured.out
+    
+    @pytest.mark.parametrize("second_response,expected", [
+        ({'edit': {'result': 'Success'}}, True),
+        ({'error': {'code': 'badtoken'}}, False),
+    ], ids=("refreshed_token_accepted", "refreshed_token_rejected"))
+    def test_import_template_bad_token_retried_once(self, importer, capsys, second_response, expected):
+        """Test that a rejected edit token is dropped from the cache and the edit retried once."""
+        importer._edit_token = ("stale-token", time.monotonic())
+        
+        with patch.object(importer, '_make_request',
+                          side_effect=[{'error': {'code': 'badtoken'}}, second_response]) as mock_request, \
+             patch.object(importer, 'get_login_token', return_value="test-login-token"), \
+             patch.object(importer, 'login', return_value=True), \
+             patch.object(importer, 'get_edit_token', return_value="fresh-token"):
+            
+            result = importer.import_template("ExpiredTemplate", "Content", "stale-token")
+            
+        assert result is expected
+        assert [c.kwargs['token'] for c in mock_request.call_args_list] == ["stale-token", "fresh-token"]
+        assert importer._edit_token[0] == "fresh-token"
+        assert "Edit token rejected for Template:ExpiredTemplate" in capsys.readouterr().out
+    
+    def test_import_template_unknown_error(self, importer, capsys):
         """Test template import with unknown error format."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
         unknown_error_response = {
             'edit': {
                 'result': 'Failure'
@@ -365,10 +392,8 @@ class TestTemplateImport:
 class TestTemplateDirectoryImport:
     """Test template directory import functionality."""
     
-    def test_import_templates_from_directory_success(self, temp_template_files, mock_mediawiki_api_response, capsys):
+    def test_import_templates_from_directory_success(self, importer, temp_template_files, mock_mediawiki_api_response, capsys):
         """Test successful import of templates from directory."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
         with patch.object(importer, 'get_login_token') as mock_get_login_token, \
              patch.object(importer, 'login') as mock_login, \
              patch.object(importer, 'get_edit_token') as mock_get_edit_token, \
@@ -395,24 +420,88 @@ class TestTemplateDirectoryImport:
         captured = capsys.readouterr()
         assert "Found 2 template files" in captured.out
     
-    def test_import_templates_from_directory_missing_dir(self, capsys):
-        """Test import from non-existent directory."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
+    def test_import_templates_from_directory_uploads_concurrently(self, importer, temp_template_files):
+        """Test that opting into workers makes template uploads overlap."""
+        both_in_flight = threading.Barrier(2, timeout=5)
+        
+        def import_template(name, content, token):
+            both_in_flight.wait()  # Breaks (and fails the import) if uploads run serially
+            return True
+        
+        with patch.object(importer, 'get_login_token', return_value="test-login-token"), \
+             patch.object(importer, 'login', return_value=True), \
+             patch.object(importer, 'get_edit_token', return_value="test-edit-token"), \
+             patch.object(importer, 'import_template', side_effect=import_template):
+            
+            success_count, failed_count = importer.import_templates_from_directory(str(temp_template_files),
+                                                                                   max_workers=2)
+            
+        assert (success_count, failed_count) == (2, 0)
+    
+    def test_import_templates_from_directory_serial_by_default(self, importer, temp_template_files):
+        """Test that uploads stay on the calling thread unless workers are requested."""
+        upload_threads = []
+        
+        def import_template(name, content, token):
+            upload_threads.append(threading.current_thread())
+            return True
+        
+        with patch.object(importer, '_get_cached_edit_token', return_value="test-edit-token"), \
+             patch.object(importer, 'import_template', side_effect=import_template), \
+             patch('mediawiki_import.ThreadPoolExecutor') as mock_executor:
+            
+            importer.import_templates_from_directory(str(temp_template_files))
+            
+        mock_executor.assert_not_called()
+        assert upload_threads == [threading.current_thread()] * 2
+    
+    def test_edit_token_reused_across_batches(self, importer, temp_template_files):
+        """Test that a second directory import reuses the cached login and edit token."""
+        with patch.object(importer, 'get_login_token', return_value="test-login-token") as mock_get_login_token, \
+             patch.object(importer, 'login', return_value=True), \
+             patch.object(importer, 'get_edit_token', return_value="test-edit-token") as mock_get_edit_token, \
+             patch.object(importer, 'import_template', return_value=True) as mock_import_template:
+            
+            importer.import_templates_from_directory(str(temp_template_files))
+            importer.import_templates_from_directory(str(temp_template_files))
+            
+        assert mock_get_login_token.call_count == 1
+        assert mock_get_edit_token.call_count == 1
+        assert mock_import_template.call_count == 4
+    
+    def test_refreshed_token_used_for_rest_of_batch(self, importer, temp_directory):
+        """Test that files after a badtoken refresh go out with the fresh token on their first request."""
+        template_dir = temp_directory / 'expiring_templates'
+        template_dir.mkdir()
+        (template_dir / 'A.wiki').write_text("First")
+        (template_dir / 'B.wiki').write_text("Second")
+        success = {'edit': {'result': 'Success'}}
         
+        with patch.object(importer, '_make_request',
+                          side_effect=[{'error': {'code': 'badtoken'}}, success, success]) as mock_request, \
+             patch.object(importer, 'get_login_token', return_value="test-login-token"), \
+             patch.object(importer, 'login', return_value=True), \
+             patch.object(importer, 'get_edit_token', side_effect=["stale-token", "fresh-token"]):
+            
+            success_count, failed_count = importer.import_templates_from_directory(str(template_dir))
+            
+        assert (success_count, failed_count) == (2, 0)
+        assert [c.kwargs['token'] for c in mock_request.call_args_list] == [
+            "stale-token", "fresh-token",  # A: rejected, then retried
+            "fresh-token",                 # B: fresh token on its first request
+        ]
+    
+    def test_import_templates_from_directory_missing_dir(self, importer, capsys):
+        """Test import from non-existent directory."""
         with pytest.raises(SystemExit):
             importer.import_templates_from_directory("/nonexistent/directory")
             
         captured = capsys.readouterr()
         assert "Template directory not found" in captured.out
     
-    def test_import_templates_from_directory_no_templates(self, temp_directory, capsys):
+    def test_import_templates_from_directory_no_templates(self, importer, prebuilt_template_dirs, capsys):
         """Test import from directory with no template files."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
-        empty_dir = temp_directory / 'empty'
-        empty_dir.mkdir()
-        
-        success_count, failed_count = importer.import_templates_from_directory(str(empty_dir))
+        success_count, failed_count = importer.import_templates_from_directory(str(prebuilt_template_dirs['empty']))
         
         assert success_count == 0
         assert failed_count == 0
@@ -421,10 +510,8 @@ class TestTemplateDirectoryImport:
         assert "No template files found" in captured.out
         assert "Template files should have .mediawiki or .wiki extension" in captured.out
     
-    def test_import_templates_from_directory_login_failure(self, temp_template_files, capsys):
+    def test_import_templates_from_directory_login_failure(self, importer, temp_template_files, capsys):
         """Test import when login fails."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
         with patch.object(importer, 'get_login_token') as mock_get_login_token, \
              patch.object(importer, 'login') as mock_login:
             
@@ -434,10 +521,8 @@ class TestTemplateDirectoryImport:
             with pytest.raises(SystemExit):
                 importer.import_templates_from_directory(str(temp_template_files))
     
-    def test_import_templates_from_directory_mixed_results(self, temp_template_files, mock_mediawiki_api_response, capsys):
+    def test_import_templates_from_directory_mixed_results(self, importer, temp_template_files, mock_mediawiki_api_response, capsys):
         """Test import with mixed success/failure results."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
         with patch.object(importer, 'get_login_token') as mock_get_login_token, \
              patch.object(importer, 'login') as mock_login, \
              patch.object(importer, 'get_edit_token') as mock_get_edit_token, \
@@ -455,27 +540,24 @@ class TestTemplateDirectoryImport:
         assert success_count == 1
         assert failed_count == 1
     
-    def test_import_templates_from_directory_file_read_error(self, temp_directory, capsys):
+    def test_import_templates_from_directory_file_read_error(self, importer, prebuilt_template_dirs,
+                                                             monkeypatch, capsys):
         """Test import when template file reading fails."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
+        def failing_read_bytes(self):
+            raise Exception("File read error")
         
-        # Create template directory with a file
-        template_dir = temp_directory / 'templates'
-        template_dir.mkdir()
-        template_file = template_dir / 'ErrorTemplate.mediawiki'
-        template_file.write_text("Template content")
+        monkeypatch.setattr(Path, 'read_bytes', failing_read_bytes)
         
         with patch.object(importer, 'get_login_token') as mock_get_login_token, \
              patch.object(importer, 'login') as mock_login, \
-             patch.object(importer, 'get_edit_token') as mock_get_edit_token, \
-             patch('builtins.open', mock_open()) as mock_file_open:
+             patch.object(importer, 'get_edit_token') as mock_get_edit_token:
             
             mock_get_login_token.return_value = "test-login-token"
             mock_login.return_value = True
             mock_get_edit_token.return_value = "test-edit-token"
-            mock_file_open.side_effect = Exception("File read error")
             
-            success_count, failed_count = importer.import_templates_from_directory(str(template_dir))
+            success_count, failed_count = importer.import_templates_from_directory(
+                str(prebuilt_template_dirs['error']))
             
         assert success_count == 0
         assert failed_count == 1
@@ -483,16 +565,21 @@ class TestTemplateDirectoryImport:
         captured = capsys.readouterr()
         assert "Error processing ErrorTemplate.mediawiki: File read error" in captured.out
     
-    def test_import_templates_template_prefix_removal(self, temp_directory):
-        """Test that 'Template_' prefix is properly removed from filenames."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
-        # Create template with Template_ prefix
-        template_dir = temp_directory / 'templates'
+    def test_import_templates_normalizes_line_endings(self, importer, temp_directory):
+        """Test that CRLF template files are imported with plain newlines."""
+        template_dir = temp_directory / 'crlf_templates'
         template_dir.mkdir()
-        template_file = template_dir / 'Template_InfoBox.mediawiki'
-        template_file.write_text("InfoBox template content")
+        (template_dir / 'Crlf.wiki').write_bytes("== Héading ==\r\nBody\r\n".encode('utf-8'))
         
+        with patch.object(importer, '_get_cached_edit_token', return_value="test-edit-token"), \
+             patch.object(importer, 'import_template', return_value=True) as mock_import_template:
+            
+            importer.import_templates_from_directory(str(template_dir))
+            
+        mock_import_template.assert_called_once_with("Crlf", "== Héading ==\nBody\n", "test-edit-token")
+    
+    def test_import_templates_template_prefix_removal(self, importer, prebuilt_template_dirs):
+        """Test that 'Template_' prefix is properly removed from filenames."""
         with patch.object(importer, 'get_login_token') as mock_get_login_token, \
              patch.object(importer, 'login') as mock_login, \
              patch.object(importer, 'get_edit_token') as mock_get_edit_token, \
@@ -503,7 +590,8 @@ class TestTemplateDirectoryImport:
             mock_get_edit_token.return_value = "test-edit-token"
             mock_import_template.return_value = True
             
-            success_count, failed_count = importer.import_templates_from_directory(str(template_dir))
+            success_count, failed_count = importer.import_templates_from_directory(
+                str(prebuilt_template_dirs['infobox']))
             
         # Verify template was imported with prefix removed
         mock_import_template.assert_called_once_with("InfoBox", "InfoBox template content", "test-edit-token")
@@ -515,49 +603,29 @@ class TestTemplateDirectoryImport:
 class TestConfigurationLoading:
     """Test configuration loading for template importer."""
     
-    def test_load_config_success(self, mock_env_vars):
+    def test_load_config_success(self, template_env):
         """Test successful configuration loading."""
-        # Template importer uses different env vars
-        template_env = {
-            'WIKI_URL': mock_env_vars['WIKI_URL'],
-            'WIKI_USERNAME': mock_env_vars['WIKI_USERNAME'],
-            'WIKI_PASSWORD': mock_env_vars['WIKI_PASSWORD'],
-            'TEMPLATE_DIR': 'test-templates'
-        }
-        
-        with patch.dict(os.environ, template_env):
-            wiki_url, username, password, template_dir = load_config()
+        wiki_url, username, password, template_dir = load_config()
             
         assert wiki_url == "http://localhost:8080"
         assert username == "testuser"
         assert password == "testpass123"
         assert template_dir == "test-templates"
     
-    def test_load_config_default_template_dir(self, mock_env_vars):
+    def test_load_config_default_template_dir(self, template_env, monkeypatch):
         """Test configuration loading with default template directory."""
-        template_env = {
-            'WIKI_URL': mock_env_vars['WIKI_URL'],
-            'WIKI_USERNAME': mock_env_vars['WIKI_USERNAME'],
-            'WIKI_PASSWORD': mock_env_vars['WIKI_PASSWORD']
-            # No TEMPLATE_DIR - should use default
-        }
+        monkeypatch.delenv('TEMPLATE_DIR')
         
-        with patch.dict(os.environ, template_env, clear=True):
-            wiki_url, username, password, template_dir = load_config()
+        wiki_url, username, password, template_dir = load_config()
             
         assert template_dir == "internal-wiki/templates"  # Default value
     
-    def test_load_config_missing_required(self, capsys):
+    def test_load_config_missing_required(self, template_env, monkeypatch, capsys):
         """Test configuration loading with missing required variables."""
-        partial_env = {
-            'WIKI_URL': 'http://localhost:8080',
-            'WIKI_USERNAME': 'testuser'
-            # Missing WIKI_PASSWORD
-        }
+        monkeypatch.delenv('WIKI_PASSWORD')
         
-        with patch.dict(os.environ, partial_env, clear=True):
-            with pytest.raises(SystemExit):
-                load_config()
+        with pytest.raises(SystemExit):
+            load_config()
                 
         captured = capsys.readouterr()
         assert "Missing required environment variables" in captured.out
@@ -570,73 +638,42 @@ class TestConfigurationLoading:
 class TestMainFunction:
     """Test main function integration."""
     
-    def test_main_success_flow(self, mock_env_vars, temp_template_files, mock_mediawiki_api_response, capsys):
-        """Test successful main function execution."""
-        template_env = {
-            'WIKI_URL': mock_env_vars['WIKI_URL'],
-            'WIKI_USERNAME': mock_env_vars['WIKI_USERNAME'],
-            'WIKI_PASSWORD': mock_env_vars['WIKI_PASSWORD'],
-            'TEMPLATE_DIR': str(temp_template_files)
-        }
-        
-        with patch.dict(os.environ, template_env), \
-             patch('mediawiki_import.MediaWikiImporter') as mock_importer_class:
-            
+    @pytest.mark.parametrize("counts,expected", [
+        ((2, 0), ("Import complete!", "Successfully imported: 2 templates",
+                  "Visit your MediaWiki at: http://localhost:8080")),
+        ((1, 1), ("Successfully imported: 1 templates", "Failed to import: 1 templates")),
+    ], ids=("all_imported", "partial_failure"))
+    def test_main_import_summary(self, template_env, monkeypatch, temp_template_files, capsys,
+                                 counts, expected):
+        """Test main() wires config into the importer and reports its counts."""
+        monkeypatch.setenv('TEMPLATE_DIR', str(temp_template_files))
+        
+        with patch('mediawiki_import.MediaWikiImporter') as mock_importer_class:
             mock_importer = mock_importer_class.return_value
-            mock_importer.import_templates_from_directory.return_value = (2, 0)  # 2 success, 0 failed
+            mock_importer.__enter__.return_value = mock_importer
+            mock_importer.import_templates_from_directory.return_value = counts  # (success, failed)
             
             main()
             
-        # Verify importer was created with correct parameters
         mock_importer_class.assert_called_once_with("http://localhost:8080", "testuser", "testpass123")
         mock_importer.import_templates_from_directory.assert_called_once_with(str(temp_template_files))
-        
-        captured = capsys.readouterr()
-        assert "Import complete!" in captured.out
-        assert "Successfully imported: 2 templates" in captured.out
-        assert "Visit your MediaWiki at: http://localhost:8080" in captured.out
-    
-    def test_main_with_failures(self, mock_env_vars, temp_template_files, capsys):
-        """Test main function with some import failures."""
-        template_env = {
-            'WIKI_URL': mock_env_vars['WIKI_URL'],
-            'WIKI_USERNAME': mock_env_vars['WIKI_USERNAME'],
-            'WIKI_PASSWORD': mock_env_vars['WIKI_PASSWORD'],
-            'TEMPLATE_DIR': str(temp_template_files)
-        }
-        
-        with patch.dict(os.environ, template_env), \
-             patch('mediawiki_import.MediaWikiImporter') as mock_importer_class:
-            
-            mock_importer = mock_importer_class.return_value
-            mock_importer.import_templates_from_directory.return_value = (1, 1)  # 1 success, 1 failed
-            
-            main()
-            
-        captured = capsys.readouterr()
-        assert "Successfully imported: 1 templates" in captured.out
-        assert "Failed to import: 1 templates" in captured.out
+        mock_importer.__exit__.assert_called_once()
+        assert_all_in(capsys.readouterr().out, expected)
     
-    def test_main_configuration_error(self, capsys):
+    def test_main_configuration_error(self, monkeypatch, capsys):
         """Test main function with configuration error."""
-        with patch.dict(os.environ, {}, clear=True):
-            with pytest.raises(SystemExit):
-                main()
+        for name in ('WIKI_URL', 'WIKI_USERNAME', 'WIKI_PASSWORD'):
+            monkeypatch.delenv(name, raising=False)
+        
+        with pytest.raises(SystemExit):
+            main()
                 
         captured = capsys.readouterr()
         assert "Missing required environment variables" in captured.out
     
-    def test_main_import_error(self, mock_env_vars, capsys):
+    def test_main_import_error(self, template_env, capsys):
         """Test main function with import error."""
-        template_env = {
-            'WIKI_URL': mock_env_vars['WIKI_URL'],
-            'WIKI_USERNAME': mock_env_vars['WIKI_USERNAME'],
-            'WIKI_PASSWORD': mock_env_vars['WIKI_PASSWORD'],
-            'TEMPLATE_DIR': 'test-templates'
-        }
-        
-        with patch.dict(os.environ, template_env), \
-             patch('mediawiki_import.MediaWikiImporter', side_effect=Exception("Connection failed")):
+        with patch('mediawiki_import.MediaWikiImporter', side_effect=Exception("Connection failed")):
             
             with pytest.raises(SystemExit):
                 main()
@@ -649,67 +686,32 @@ class TestMainFunction:
 class TestApiEdgeCases:
     """Test API edge cases and error scenarios."""
     
-    def test_make_request_all_retries_exhausted(self, capsys):
-        """Test API request when all retries are exhausted."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
-        with patch.object(importer.session, 'post') as mock_post, \
-             patch('time.sleep') as mock_sleep:
-            
-            # All attempts fail with timeout
-            mock_post.side_effect = [
-                requests.exceptions.Timeout("Timeout 1"),
-                requests.exceptions.Timeout("Timeout 2"),
-                requests.exceptions.Timeout("Timeout 3")
-            ]
-            
-            with pytest.raises(Exception, match="Request timeout"):
-                importer._make_request("POST", action="test")
-                
-        assert mock_post.call_count == 3
-        assert mock_sleep.call_count == 2  # No sleep after final attempt
-        
-        captured = capsys.readouterr()
-        assert "API request timed out after 3 attempts" in captured.out
-    
-    def test_make_request_connection_failure_exhausted(self, capsys):
-        """Test API request when connection failures are exhausted."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
+    @pytest.mark.parametrize("failure,backoffs,_retry_log,error,output", _RETRY_FAILURES, ids=_RETRY_FAILURE_IDS)
+    def test_make_request_retries_exhausted(self, importer, api, sleep_calls, capsys,
+                                            failure, backoffs, _retry_log, error, output):
+        """Test API request when every attempt fails."""
+        for _ in range(3):
+            api.post(_API_URL, **failure)
         
-        with patch.object(importer.session, 'post') as mock_post:
-            mock_post.side_effect = [
-                requests.exceptions.ConnectionError("Conn 1"),
-                requests.exceptions.ConnectionError("Conn 2"),
-                requests.exceptions.ConnectionError("Conn 3")
-            ]
-            
-            with pytest.raises(Exception, match="Connection failed"):
-                importer._make_request("POST", action="test")
+        with pytest.raises(Exception, match=error):
+            importer._make_request("POST", action="test")
                 
-        captured = capsys.readouterr()
-        assert "API connection failed" in captured.out
-        assert "Check MediaWiki URL and network connectivity" in captured.out
+        assert len(api.calls) == 3
+        assert sleep_calls == backoffs  # No sleep after final attempt
+        assert output in capsys.readouterr().out
     
-    def test_make_request_http_error_403(self, capsys):
+    def test_make_request_http_error_403(self, importer, api, capsys):
         """Test API request with 403 Forbidden error."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
+        api.post(_API_URL, status=403)
         
-        with patch.object(importer.session, 'post') as mock_post:
-            forbidden_response = MagicMock()
-            forbidden_response.status_code = 403
-            forbidden_response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=forbidden_response)
-            mock_post.return_value = forbidden_response
-            
-            with pytest.raises(Exception, match="HTTP error: 403"):
-                importer._make_request("POST", action="test")
+        with pytest.raises(Exception, match=_HTTP_403_ERR):
+            importer._make_request("POST", action="test")
                 
         captured = capsys.readouterr()
         assert "API request failed" in captured.out
     
-    def test_import_template_with_special_characters(self, mock_mediawiki_api_response):
+    def test_import_template_with_special_characters(self, importer, mock_mediawiki_api_response):
         """Test template import with special characters in content."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
         special_content = """<div class="special-template">
 {{{{1|Default value with "quotes" and 'apostrophes'}}}}
 <!-- Template comment with Unicode: 🚀 ✨ -->
@@ -738,10 +740,8 @@ class TestApiEdgeCases:
 class TestPerformanceAndLargeTemplates:
     """Test performance with large template sets."""
     
-    def test_import_large_template_set(self, temp_directory, capsys):
+    def test_import_large_template_set(self, importer, temp_directory, capsys):
         """Test importing a large set of templates."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
         # Create a large number of template files
         template_dir = temp_directory / 'large_templates'
         template_dir.mkdir()
@@ -770,10 +770,8 @@ class TestPerformanceAndLargeTemplates:
         captured = capsys.readouterr()
         assert "Found 50 template files" in captured.out
     
-    def test_import_very_large_template_content(self):
+    def test_import_very_large_template_content(self, importer):
         """Test importing a template with very large content."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
         # Create a very large template (simulating a complex template)
         large_content_parts = [
             "{{#switch: {{{type|info}}}",
@@ -810,10 +808,8 @@ class TestPerformanceAndLargeTemplates:
 class TestFileHandling:
     """Test template file handling edge cases."""
     
-    def test_import_templates_mixed_file_extensions(self, temp_directory):
+    def test_import_templates_mixed_file_extensions(self, importer, temp_directory):
         """Test importing templates with mixed file extensions."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
-        
         template_dir = temp_directory / 'mixed_templates'
         template_dir.mkdir()
         
@@ -839,10 +835,42 @@ class TestFileHandling:
         assert failed_count == 0
         assert mock_import_template.call_count == 2
     
-    def test_import_templates_empty_files(self, temp_directory, capsys):
-        """Test importing empty template files."""
-        importer = MediaWikiImporter("http://localhost:8080", "testuser", "testpass")
+    def test_import_templates_selection_rules(self, importer, temp_directory):
+        """Test that hidden templates are imported while directories and other files are not."""
+        template_dir = temp_directory / 'selection_templates'
+        template_dir.mkdir()
+        (template_dir / '.hidden.wiki').write_text("Hidden template")
+        (template_dir / 'Visible.mediawiki').write_text("Visible template")
+        (template_dir / 'x.wiki').mkdir()
+        (template_dir / 'notes.txt').write_text("Not a template")
+        
+        with patch.object(importer, '_get_cached_edit_token', return_value="test-edit-token"), \
+             patch.object(importer, 'import_template', return_value=True) as mock_import_template:
+            
+            success_count, failed_count = importer.import_templates_from_directory(str(template_dir))
+            
+        assert {c.args[0] for c in mock_import_template.call_args_list} == {".hidden", "Visible"}
+        assert (success_count, failed_count) == (2, 0)
+    
+    def test_import_templates_order_and_case(self, importer, temp_directory):
+        """Test that *.mediawiki files import before *.wiki ones, by name, with glob's case rules."""
+        template_dir = temp_directory / 'ordered_templates'
+        template_dir.mkdir()
+        for name in ('B.wiki', 'Z.mediawiki', 'A.wiki', 'C.mediawiki', 'Up.WIKI'):
+            (template_dir / name).write_text(f"{name} content")
+        # Like glob, an upper-case suffix only matches where paths are case-insensitive
+        case_insensitive = os.path.normcase('A') == 'a'
         
+        with patch.object(importer, '_get_cached_edit_token', return_value="test-edit-token"), \
+             patch.object(importer, 'import_template', return_value=True) as mock_import_template:
+            
+            importer.import_templates_from_directory(str(template_dir))
+            
+        imported = [c.args[0] for c in mock_import_template.call_args_list]
+        assert imported == ["C", "Z", "A", "B"] + (["Up"] if case_insensitive else [])
+    
+    def test_import_templates_empty_files(self, importer, temp_directory, capsys):
+        """Test importing empty template files."""
         template_dir = temp_directory / 'empty_templates'
         template_dir.mkdir()
         